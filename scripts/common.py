@@ -15,6 +15,7 @@ import subprocess
 import shutil
 import tempfile
 import email
+import binascii
 from config import config
 import re
 import html2text
@@ -178,6 +179,103 @@ def html_to_plain_text_hack(html_content):
     
     return text.strip()
 
+_BASE64_JUNK_RE = re.compile(r'[^A-Za-z0-9+/=]')
+
+def write_part_payload(part, out, chunk_size=65536):
+    """
+    Writes the decoded payload of a non-multipart MIME part to the binary
+    file object `out`. Base64 and quoted-printable payloads are decoded chunk
+    by chunk straight into `out`, so no second full-size copy of the
+    attachment is held in memory. Other transfer encodings, and payloads the
+    strict paths cannot handle, go through part.get_payload(decode=True).
+    """
+    raw = part.get_payload(decode=False)
+    cte = str(part.get('Content-Transfer-Encoding', '')).strip().lower()
+    if isinstance(raw, str) and cte == 'base64':
+        start_pos = out.tell()
+        try:
+            pending = ''
+            padded = False
+            for start in range(0, len(raw), chunk_size):
+                data = pending + ''.join(raw[start:start + chunk_size].split())
+                if not data:
+                    continue
+                if padded:
+                    # Padding ends the payload; what follows it is left to
+                    # the email package, whatever chunk it lands in
+                    raise ValueError("data after base64 padding")
+                if _BASE64_JUNK_RE.search(data):
+                    raise ValueError("unexpected characters in base64 payload")
+                cut = len(data) - len(data) % 4
+                padding = data.find('=')
+                if padding >= 0:
+                    # Only the last complete quad may be padded, with nothing
+                    # kept back after it
+                    if padding < cut - 4 or cut < len(data):
+                        raise ValueError("padding inside base64 payload")
+                    padded = True
+                out.write(binascii.a2b_base64(data[:cut]))
+                pending = data[cut:]
+            if pending:
+                out.write(binascii.a2b_base64(pending))
+            return
+        except (binascii.Error, ValueError):
+            # Fall back to the email package's lenient decoder
+            out.seek(start_pos)
+            out.truncate()
+    elif isinstance(raw, str) and cte == 'quoted-printable':
+        start_pos = out.tell()
+        try:
+            start = 0
+            while start < len(raw):
+                # Cut after a line break, where no escape or soft break can
+                # straddle the chunk boundary
+                end = raw.find('\n', start + chunk_size)
+                end = len(raw) if end < 0 else end + 1
+                out.write(binascii.a2b_qp(raw[start:end].encode('ascii')))
+                start = end
+            return
+        except UnicodeError:
+            # Non-ASCII in the payload; let the email package pick the bytes
+            out.seek(start_pos)
+            out.truncate()
+    payload = part.get_payload(decode=True)
+    if payload:
+        out.write(payload)
+
+def classify_part(part):
+    """
+    Returns (content_type, is_attachment) for a non-multipart MIME part,
+    matching part.get_content_type() and the check
+    part.get_content_disposition() == 'attachment' or part.get_filename().
+    Both are answered from the raw header strings, so the common case never
+    runs the structured header parser; only parts whose headers might carry
+    a file name, or whose Content-Type looks unusual, take the slow path.
+    """
+    raw_type = None
+    raw_disposition = None
+    for name, value in part.raw_items():
+        name = name.lower()
+        if name == 'content-type' and raw_type is None:
+            raw_type = value
+        elif name == 'content-disposition' and raw_disposition is None:
+            raw_disposition = value
+
+    if raw_type is None:
+        content_type = part.get_default_type()
+    else:
+        content_type = raw_type.split(';', 1)[0].strip().lower()
+        if content_type.count('/') != 1 or '(' in content_type:
+            content_type = part.get_content_type()
+
+    if raw_disposition is not None and raw_disposition.split(';', 1)[0].strip().lower() == 'attachment':
+        is_attachment = True
+    elif 'name' in (raw_disposition or '').lower() or 'name' in (raw_type or '').lower():
+        is_attachment = bool(part.get_filename())
+    else:
+        is_attachment = False
+    return content_type, is_attachment
+
 def create_date_item ( timestamp ):
     """Creates a sortable QTableWidgetItem for the date."""
     if not isinstance(timestamp, (int, float)):
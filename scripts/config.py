@@ -229,17 +229,25 @@ class Config:
     def get_max_search_history(self):
         return self.data.get("searches", {}).get("max_search_history", 20)
 
+    def get_max_mail_size(self):
+        """Mail files larger than this many bytes are only opened on request; 0 disables the check."""
+        return self.data.get("viewer", {}).get("max_mail_size", 100 * 1024 * 1024)
+
     def get_history_path(self):
         return self.config_dir / "query_history.json"
 
     def get_autocompletions(self, category="headers"):
         return self.data.get("autocomplete", {}).get(category, [])
 
+    def get_my_addresses(self) -> set:
+        """Casefolded addresses of all identities, for membership tests."""
+        my_addresses = getaddresses([me["email"] for me in self.get_identities()])
+        return {addr.casefold() for name, addr in my_addresses}
+
     def is_me(self, address_string_list) -> bool:
         from_addresses = getaddresses(address_string_list)
         from_addrs_only = {addr.casefold() for name, addr in from_addresses}
-        my_addresses = getaddresses([me["email"] for me in self.get_identities()])
-        my_addrs_only = {addr.casefold() for name, addr in my_addresses}
+        my_addrs_only = self.get_my_addresses()
         # print(f"DEBUG:{from_addrs_only} vs {my_addrs_only}")
         return not from_addrs_only.isdisjoint(my_addrs_only)
 
@@ -4,9 +4,13 @@ import sys
 import argparse
 import os
 import email
+import email.contentmanager
 from email import policy
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
+from email.generator import BytesGenerator
+from email.parser import BytesFeedParser
+from io import BytesIO
 from pathlib import Path
 import tempfile
 import re
@@ -16,8 +20,8 @@ from PySide6.QtWidgets import (
     QFormLayout, QLabel, QFileDialog, QSizePolicy, QMenu, QComboBox,
     QDialogButtonBox, QGroupBox, QAbstractItemView
 )
-from PySide6.QtCore import Qt, QSize, QObject, QEvent
-from PySide6.QtGui import QFont, QAction, QKeySequence, QDrag
+from PySide6.QtCore import Qt, QSize, QObject, QEvent, QUrl
+from PySide6.QtGui import QFont, QAction, QKeySequence, QDrag, QDesktopServices
 import logging
 import mimetypes
 import subprocess
@@ -30,11 +34,35 @@ import re
 from email.header import Header
 
 from config import config
-from common import display_error
+from common import display_error, write_part_payload, classify_part
 from header_widget_editable import MailHeaderEditableWidget
 
-# Set up basic logging to console
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+# Shared content manager for attachment parts; avoids going through
+# EmailMessage.set_content's policy lookup for every attachment.
+_RAW_CM = email.contentmanager.raw_data_manager
+
+
+class _CachingBytesGenerator(BytesGenerator):
+    """BytesGenerator that reuses the flattened bytes of attachment parts.
+
+    Attachments never change once they are on the draft, so their
+    (base64-heavy) serialization is computed on the first save and spliced
+    in verbatim on every later one. Parts opt in by carrying a
+    `_cached_bytes` dict, keyed by the line separator used to flatten them.
+    """
+
+    def flatten(self, msg, unixfrom=False, linesep=None):
+        cache = getattr(msg, '_cached_bytes', None)
+        if cache is None or unixfrom:
+            return super().flatten(msg, unixfrom=unixfrom, linesep=linesep)
+        policy = msg.policy if self.policy is None else self.policy
+        key = linesep or policy.linesep
+        data = cache.get(key)
+        if data is None:
+            buf = BytesIO()
+            BytesGenerator(buf, self._mangle_from_, None, policy=policy).flatten(msg, linesep=linesep)
+            data = cache[key] = buf.getvalue()
+        self._fp.write(data)
 
 # --- Mail Editor Main Class ---
 
@@ -82,8 +110,12 @@ class MailEditor(QMainWindow):
             return None
         
         try:
-            with open(mail_file_path, 'rb') as f:
-                return email.message_from_binary_file(f, policy=policy.default)
+            # Feed the parser in chunks so no full copy of the file is held
+            parser = BytesFeedParser(policy=policy.default)
+            with open(mail_file_path, 'rb', buffering=0) as f:
+                while chunk := f.read(65536):
+                    parser.feed(chunk)
+            return parser.close()
         except Exception as e:
             logging.error(f"Failed to parse draft mail file: {e}")
             display_error(self, "Parsing Error", f"Failed to parse draft mail file:\n{e}")
@@ -229,25 +261,31 @@ class MailEditor(QMainWindow):
         # The headers are already populated by the MailHeaderEditableWidget
         # Just populate the body and attachments
         
-        # Find and set the body text
-        plain_text_body = ""
+        # Find the body text and any attachments in one walk, looking at
+        # each part's headers only once
+        body_part = None
+        filenames = []
         for part in self.draft_message.walk():
-            if part.get_content_type() == 'text/plain' and not part.get_filename():
-                payload = part.get_payload(decode=True)
-                if isinstance(payload, bytes):
-                    plain_text_body = payload.decode('utf-8', errors='replace')
-                else:
-                    plain_text_body = str(payload) if payload else ""
-                break
-        self.body_edit.setPlainText(plain_text_body)
+            content_type, _ = classify_part(part)
+            disposition = part.get_content_disposition()
+            filename = part.get_filename() if content_type == 'text/plain' or disposition == 'attachment' else None
+            if body_part is None and content_type == 'text/plain' and not filename:
+                body_part = part
+            if disposition == 'attachment' and filename:
+                part._cached_bytes = {}
+                self.attachments.append(part)
+                filenames.append(filename)
+        # One insertion for the whole list instead of one per attachment
+        self.attachments_list.addItems(filenames)
 
-        # Find and add any attachments
-        for part in self.draft_message.walk():
-            if part.get_content_disposition() == 'attachment':
-                filename = part.get_filename()
-                if filename:
-                    self.attachments.append(part)
-                    self.attachments_list.addItem(filename)
+        plain_text_body = ""
+        if body_part is not None:
+            payload = body_part.get_payload(decode=True)
+            if isinstance(payload, bytes):
+                plain_text_body = payload.decode('utf-8', errors='replace')
+            else:
+                plain_text_body = str(payload) if payload else ""
+        self.body_edit.setPlainText(plain_text_body)
 
     def toggle_more_headers(self):
         """Toggle visibility of additional header fields."""
@@ -308,16 +346,24 @@ class MailEditor(QMainWindow):
                 
             with open(file_path, 'rb') as f:
                 part = email.message.EmailMessage()
-                part.set_content(f.read(), maintype=maintype, subtype=subtype)
+                _RAW_CM.set_content(part, f.read(), maintype, subtype)
                 part.add_header('Content-Disposition', 'attachment', filename=file_path.name)
+                part._cached_bytes = {}
                 self.attachments.append(part)
                 self.attachments_list.addItem(file_path.name)
         except Exception as e:
             display_error(self, "Failed to Add Attachment", f"Failed to add attachment:\n{e}")
 
     def remove_attachment_selected(self):
-        for item in self.attachments_list.selectedItems():
-            self.remove_attachment(item)
+        rows = {self.attachments_list.row(item) for item in self.attachments_list.selectedItems()}
+        if not rows:
+            return
+        # Rebuild the list once instead of taking the items out one by one,
+        # which shifts and relayouts the remaining rows per removal
+        names = [self.attachments_list.item(row).text() for row in range(self.attachments_list.count())]
+        self.attachments = [part for row, part in enumerate(self.attachments) if row not in rows]
+        self.attachments_list.clear()
+        self.attachments_list.addItems([name for row, name in enumerate(names) if row not in rows])
 
     def remove_attachment(self, item):
         row = self.attachments_list.row(item)
@@ -355,31 +401,31 @@ class MailEditor(QMainWindow):
             if not filename:
                 filename = f"attachment_{part_index}.bin" # Default extension for safety
                 
-            # 2. Get the content, accommodating both bytes (binary) and string (text) payloads
-            payload_data = attachment_part.get_payload(decode=True) 
-            
-            if isinstance(payload_data, bytes):
-                payload_bytes = payload_data
-            elif isinstance(payload_data, str):
-                # If it's a decoded string (i.e., a text attachment), encode it back 
-                # to bytes for writing to the binary file handle.
-                payload_bytes = payload_data.encode(
-                    attachment_part.get_content_charset() or 'utf-8', 
-                    errors='replace'
-                )
-            else:
-                display_error(self, "type error", f"Attachment payload has unexpected type: {type(payload_data).__name__}")
+            # 2. Multipart containers have no payload of their own to open
+            if attachment_part.is_multipart():
+                display_error(self, "type error", f"Attachment payload has unexpected type: {attachment_part.get_content_type()}")
                 return
 
             # 3. Write to a temporary file
             temp_file_descriptor, temp_path = tempfile.mkstemp(prefix="mail_attach_", suffix=f"_{filename}")
             
             try:
+                # Decode straight into the file instead of holding the whole
+                # decoded attachment in memory first
                 with os.fdopen(temp_file_descriptor, 'wb') as temp_file:
-                    temp_file.write(payload_bytes)
+                    write_part_payload(attachment_part, temp_file)
                     
-                # 4. Open the temporary file
-                subprocess.run(["xdg-open", temp_path], check=True) 
+                # 4. Open the temporary file, detached so the editor stays responsive
+                try:
+                    subprocess.Popen(
+                        ["xdg-open", temp_path],
+                        stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                        start_new_session=True
+                    )
+                except FileNotFoundError:
+                    # No xdg-open installed; let Qt hand the file to the platform opener
+                    if not QDesktopServices.openUrl(QUrl.fromLocalFile(temp_path)):
+                        raise
                 
             finally:
                 # Delete the temporary file immediately after the command starts
@@ -475,7 +521,8 @@ class MailEditor(QMainWindow):
                         value = Header(value, 'utf-8').encode()
                     line = f"{header_name}: {value}\r\n"
                     tmp_file.write(line.encode('utf-8'))
-                tmp_file.write(body_part.as_bytes())
+                # Attachment sub-trees are spliced in from their cached bytes
+                _CachingBytesGenerator(tmp_file, mangle_from_=False, policy=body_part.policy).flatten(body_part)
 
             return new_draft_path
 
@@ -560,7 +607,10 @@ def main():
     parser.add_argument("--mail-file", required=True, help="The full path to the mail file containing the pre-drafted email.")
     parser.add_argument("--change-id", action='store_true')
     args = parser.parse_args()
-    
+
+    # Set up basic logging to console
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
     app = QApplication(sys.argv)
 
     from common import setup_tooltip_font
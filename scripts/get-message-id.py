@@ -1,6 +1,8 @@
 import sys
-import email
+import io
 from email import policy
+from email.parser import BytesParser
+from itertools import takewhile
 
 def get_message_id_from_file(file_path):
     """
@@ -15,7 +17,9 @@ def get_message_id_from_file(file_path):
     """
     try:
         with open(file_path, 'rb') as f:
-            msg = email.message_from_binary_file(f, policy=policy.compat32)
+            # Only the headers are needed; stop reading at the blank line
+            header_bytes = b''.join(takewhile(lambda line: line.strip(b'\r\n'), f))
+            msg = BytesParser(policy=policy.compat32).parse(io.BytesIO(header_bytes), headersonly=True)
             message_id = msg['Message-ID']
             if message_id:
                 return message_id.strip('<>')
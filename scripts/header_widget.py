@@ -14,6 +14,22 @@ from PySide6.QtCore import (
 from email.utils import parsedate_to_datetime
 from common import create_date_item
 
+# Match full address: "Name <email>", Name <email>, <email>, or just email, exclude separating commas.
+# Every repetition is bounded (RFC 5321 lengths for the address parts), so a
+# long header without '<' cannot make the name alternative backtrack quadratically.
+_EMAIL_RE = re.compile(
+    r'(?:"([^"]{1,256})"|([^<>,]{1,256}))?\s*<([A-Za-z0-9._%+-]{1,64}@[A-Za-z0-9.-]{1,253}\.[A-Za-z]{2,24})>'
+    r'|[A-Za-z0-9._%+-]{1,64}@[A-Za-z0-9.-]{1,253}\.[A-Za-z]{2,24}'
+)
+
+# Header rows shown above the Date row, in display order: (label, header name)
+_HEADER_ORDER = (
+    ("Subject:", "Subject"),
+    ("From:",    "From"),
+    ("To:",      "To"),
+    ("Cc:",      "Cc"),
+)
+
 class MailHeaderTableWidget(QTableWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -178,10 +194,11 @@ class LabelDelegate(QStyledItemDelegate):
 class AddressDelegate(QStyledItemDelegate):
     def __init__(self, parent, config):
         super().__init__(parent)
-        self.selected_addresses = {} # Key: (row, col) tuple, Value: list of selected addresses
-        # Match full address: "Name <email>", Name <email>, <email>, or just email, explude separating commas
-        self.email_regex = r'(?:"([^"]+)"|([^<>,]+))?\s*<([A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,})>|[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}'
+        self.selected_addresses = {} # Key: selected address, Value: True; ordered by selection
+        self.email_regex = _EMAIL_RE
         self.config = config
+        # Delegates are recreated on config changes, so the font can be kept
+        self.text_font = self.config.get_text_font()
         self.text_selection = {}  # (row, col) -> (start_char, end_char)
         self.selection_start_cell = None
 
@@ -192,19 +209,20 @@ class AddressDelegate(QStyledItemDelegate):
         opt.state &= ~QStyle.State_HasFocus
         
         doc = QTextDocument()
-        doc.setDefaultFont(self.config.get_text_font())
+        doc.setDefaultFont(self.text_font)
         text = index.data(Qt.DisplayRole) if index.data(Qt.DisplayRole) else ""
         doc.setPlainText(text)
         doc.setTextWidth(opt.rect.width())
         
         row, col = index.row(), index.column()
-        addresses_to_highlight = self.selected_addresses.get((row, col), [])
         
         cursor = QTextCursor(doc)
         
         # Apply email address highlighting (yellow)
-        for address in addresses_to_highlight:
-            for match in re.finditer(re.escape(address), text):
+        if self.selected_addresses:
+            for match in self.email_regex.finditer(text):
+                if match.group(0) not in self.selected_addresses:
+                    continue
                 cursor.setPosition(match.start())
                 cursor.setPosition(match.end(), QTextCursor.KeepAnchor)
                 
@@ -230,7 +248,7 @@ class AddressDelegate(QStyledItemDelegate):
 
     def sizeHint(self, option, index):
         doc = QTextDocument()
-        doc.setDefaultFont(self.config.get_text_font())
+        doc.setDefaultFont(self.text_font)
         text = index.data(Qt.DisplayRole) if index.data(Qt.DisplayRole) else ""
         doc.setPlainText(text)
         doc.setTextWidth(option.rect.width())
@@ -241,7 +259,7 @@ class AddressDelegate(QStyledItemDelegate):
         text = index.data(Qt.DisplayRole) if index.data(Qt.DisplayRole) else ""
         
         doc = QTextDocument()
-        doc.setDefaultFont(self.config.get_text_font())
+        doc.setDefaultFont(self.text_font)
         doc.setPlainText(text)
         doc.setTextWidth(self.parent().visualRect(index).width())
         
@@ -266,7 +284,7 @@ class AddressDelegate(QStyledItemDelegate):
         
         text = index.data(Qt.DisplayRole) if index.data(Qt.DisplayRole) else ""
         doc = QTextDocument()
-        doc.setDefaultFont(self.config.get_text_font())
+        doc.setDefaultFont(self.text_font)
         doc.setPlainText(text)
         doc.setTextWidth(self.parent().visualRect(index).width())
         
@@ -301,10 +319,9 @@ class AddressDelegate(QStyledItemDelegate):
     def editorEvent(self, event, model, option, index):
         if event.type() == QEvent.Type.MouseButtonPress and event.button() == Qt.RightButton:
             text = index.data(Qt.DisplayRole) if index.data(Qt.DisplayRole) else ""
-            row, col = index.row(), index.column()
             
             doc = QTextDocument()
-            doc.setDefaultFont(self.config.get_text_font())  # Must match font used in paint()
+            doc.setDefaultFont(self.text_font)  # Must match font used in paint()
             doc.setPlainText(text)
             doc.setTextWidth(option.rect.width())
             
@@ -312,19 +329,17 @@ class AddressDelegate(QStyledItemDelegate):
             
             char_pos = doc.documentLayout().hitTest(hit_point, Qt.HitTestAccuracy.ExactHit)
             
-            for match in re.finditer(self.email_regex, text):
+            for match in self.email_regex.finditer(text):
                 if match.start() <= char_pos <= match.end():
                     address = match.group(0)
                     
-                    if (row, col) not in self.selected_addresses:
-                        self.selected_addresses[(row, col)] = []
-                    
-                    if address in self.selected_addresses[(row, col)]:
-                        self.selected_addresses[(row, col)].remove(address)
+                    if address in self.selected_addresses:
+                        del self.selected_addresses[address]
                     else:
-                        self.selected_addresses[(row, col)].append(address)
+                        self.selected_addresses[address] = True
                     
-                    model.dataChanged.emit(index, index, [Qt.DecorationRole, Qt.DisplayRole])
+                    # The same address may appear in several cells
+                    self.parent().viewport().update()
                     return True # Event handled
         else:
             return False # Allow default behavior for left/middle clicks (text selection)
@@ -333,6 +348,7 @@ class AddressDelegate(QStyledItemDelegate):
 class MailHeaderWidget(QWidget):
     def __init__(self, parent, config, message):
         super().__init__(parent)
+        self.config = config
         main_layout = QVBoxLayout(self)
 
         self.table_widget = MailHeaderTableWidget(self)
@@ -367,13 +383,10 @@ class MailHeaderWidget(QWidget):
             except Exception:
                 pass
 
-        self.data = [   
-            ("Subject:", message.get("Subject")),
-            ("From:",    message.get("From")),
-            ("To:",      message.get("To")),
-            ("Cc:",      message.get("Cc")),
-            ("Date:",    f"{date_header}  [{create_date_item(timestamp).text()}]")
-        ]
+        # Absent headers get no row, so the table is sized to what it shows
+        msg_get = message.get
+        self.data = [ (label, value) for label, name in _HEADER_ORDER if (value := msg_get(name)) ]
+        self.data.append( ("Date:", f"{date_header}  [{create_date_item(timestamp).text()}]") )
         
         self.table_widget.setRowCount(len(self.data))
         self.populate_table(config)
@@ -400,18 +413,18 @@ class MailHeaderWidget(QWidget):
     
     def update_fonts(self):
         """Recreate delegates and repaint after config changes."""
-        self.label_delegate = LabelDelegate(self.table_widget, config)
+        selected_addresses = self.address_delegate.selected_addresses
+        self.label_delegate = LabelDelegate(self.table_widget, self.config)
         self.table_widget.setItemDelegateForColumn(0, self.label_delegate)
-        self.address_delegate = AddressDelegate(self.table_widget, config)
+        self.address_delegate = AddressDelegate(self.table_widget, self.config)
+        # Selections live in the delegate; carry them over to the new one
+        self.address_delegate.selected_addresses = selected_addresses
         self.table_widget.setItemDelegateForColumn(1, self.address_delegate)
         self.table_widget.viewport().update()
 
     def get_selected_addresses(self):
         """Return list of all selected email addresses"""
-        addresses = []
-        for cell_addresses in self.address_delegate.selected_addresses.values():
-            addresses.extend(cell_addresses)
-        return addresses
+        return list(self.address_delegate.selected_addresses)
 
 class MailClient(QMainWindow):
     def __init__(self):
@@ -6,15 +6,14 @@ import json
 import subprocess
 import shutil
 from pathlib import Path
-import time
 import secrets
 from datetime import datetime
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-    QPushButton, QTableWidget, QTableWidgetItem, QHeaderView,
+    QPushButton, QTableView, QHeaderView,
     QAbstractItemView, QMenu, QStyledItemDelegate, QLineEdit, QInputDialog
 )
-from PySide6.QtCore import Qt, QSize, QEvent, QTimer, QRect, QPoint, QMimeData, QByteArray, QDataStream, QIODevice
+from PySide6.QtCore import Qt, QSize, QEvent, QTimer, QRect, QPoint, QMimeData, QByteArray, QDataStream, QIODevice, QAbstractTableModel, QModelIndex
 from PySide6.QtGui import QMouseEvent, QFontMetrics, QAction, QDrag, QColor
 import logging
 
@@ -57,10 +56,12 @@ class NoSelectTextDelegate(QStyledItemDelegate):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.click_pos = None
+        # The delegate is recreated on config changes, so the font is looked up once here
+        self.text_font = config.get_text_font()
         
     def createEditor(self, parent, option, index):
         editor = CustomLineEdit(parent)
-        editor.setFont(config.get_text_font())
+        editor.setFont(self.text_font)
         return editor
     
     def setEditorData(self, editor, index):
@@ -116,6 +117,119 @@ class DragHandleDelegate(QStyledItemDelegate):
             super().paint(painter, option, index)
 
 
+# The only roles QueryTableModel answers; a paint asks for about a dozen per
+# cell, and the others are turned away before any other work
+_QUERY_MODEL_ROLES = frozenset((
+    Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole, Qt.ItemDataRole.FontRole
+))
+
+# Flags depend only on whether a cell is in the input row or the handle
+# column, so the three possible values are built once
+_INPUT_ROW_FLAGS = Qt.ItemFlag.ItemIsEnabled
+_HANDLE_FLAGS = Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
+_QUERY_FLAGS = Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable | Qt.ItemFlag.ItemIsEditable
+
+
+class QueryTableModel(QAbstractTableModel):
+    """
+    Table model over the named queries. Row 0 is the input row, whose line
+    edits are index widgets owned by the view; the queries are rows 1..n and
+    live in two plain lists. Column 2 is the drag handle.
+    """
+    def __init__(self, font, parent=None):
+        super().__init__(parent)
+        self.names = []
+        self.queries = []
+        self.font = font
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.names) + 1
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else 3
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if role not in _QUERY_MODEL_ROLES or not index.isValid():
+            return None
+        row, column = index.row(), index.column()
+        if role != Qt.ItemDataRole.FontRole:
+            if row == 0 or column == 2:
+                return ""
+            return self.names[row - 1] if column == 0 else self.queries[row - 1]
+        return self.font if column < 2 else None
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        if role != Qt.ItemDataRole.EditRole or not index.isValid():
+            return False
+        row, column = index.row(), index.column()
+        if row == 0 or column == 2:
+            return False
+        if column == 0:
+            self.names[row - 1] = str(value)
+        else:
+            self.queries[row - 1] = str(value)
+        self.dataChanged.emit(index, index, [Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole])
+        return True
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.ItemFlag.NoItemFlags
+        if index.row() == 0:
+            return _INPUT_ROW_FLAGS
+        if index.column() == 2:
+            return _HANDLE_FLAGS
+        return _QUERY_FLAGS
+
+    def set_queries(self, queries):
+        self.beginResetModel()
+        self.names = [name for name, _ in queries]
+        self.queries = [query for _, query in queries]
+        self.endResetModel()
+
+    def set_font(self, font):
+        self.font = font
+        if self.names:
+            self.dataChanged.emit(self.index(1, 0), self.index(len(self.names), 1), [Qt.ItemDataRole.FontRole])
+
+    def query_at(self, row):
+        """Returns the (name, query) of a query row, stripped."""
+        return self.names[row - 1].strip(), self.queries[row - 1].strip()
+
+    def insert_query(self, row, name, query):
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.names.insert(row - 1, name)
+        self.queries.insert(row - 1, query)
+        self.endInsertRows()
+
+    def removeRows(self, row, count, parent=QModelIndex()):
+        if parent.isValid() or row < 1 or count < 1 or row + count - 1 > len(self.names):
+            return False
+        self.beginRemoveRows(QModelIndex(), row, row + count - 1)
+        del self.names[row - 1:row - 1 + count]
+        del self.queries[row - 1:row - 1 + count]
+        self.endRemoveRows()
+        return True
+
+    def move_row(self, source, target):
+        """Moves query row `source` so that it ends up as row `target`."""
+        if source == target or min(source, target) < 1 or max(source, target) > len(self.names):
+            return False
+        # beginMoveRows wants the row the moved one is inserted before, counted
+        # before the move
+        destination = target + 1 if target > source else target
+        if not self.beginMoveRows(QModelIndex(), source, source, QModelIndex(), destination):
+            return False
+        self.names.insert(target - 1, self.names.pop(source - 1))
+        self.queries.insert(target - 1, self.queries.pop(source - 1))
+        self.endMoveRows()
+        return True
+
+    def queries_to_save(self):
+        """Returns the non-empty queries as [name, query] pairs, in table order."""
+        pairs = ( [name.strip(), query.strip()] for name, query in zip(self.names, self.queries) )
+        return [ pair for pair in pairs if pair[0] or pair[1] ]
+
+
 class QueryEditor(QMainWindow):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -124,10 +238,22 @@ class QueryEditor(QMainWindow):
         
         self.query_parser = QueryParser(config.config_path.parent)
         
+        # Fonts are looked up once and refreshed on config changes
+        self.interface_font = config.get_interface_font()
+        self.menu_font = config.get_menu_font()
+        self.text_font = config.get_text_font()
+        
         # Create our custom delegates
         self.text_delegate = NoSelectTextDelegate()
         self.drag_handle_delegate = DragHandleDelegate()
         
+        # Edits, moves and deletions in quick succession are written to the
+        # queries file once, shortly after the last of them
+        self.save_timer = QTimer(self)
+        self.save_timer.setSingleShot(True)
+        self.save_timer.setInterval(200)
+        self.save_timer.timeout.connect(self.save_queries_from_table)
+        
         # Drag-and-drop related variables
         self.dragging_row = -1
         self.drag_start_pos = None
@@ -139,11 +265,6 @@ class QueryEditor(QMainWindow):
         self.double_click_interval = QApplication.instance().styleHints().mouseDoubleClickInterval()
         self.is_double_click_pending = False
         
-        # Flag to track if we're currently processing a cell change
-        self.is_processing_cell_change = False
-        # Flag to track if we're moving a row
-        self.is_moving_row = False
-        
         # Store context menu position for later use
         self.context_menu_row = -1
         self.context_menu_column = -1
@@ -155,7 +276,7 @@ class QueryEditor(QMainWindow):
         
     def setup_ui(self):
         central_widget = QWidget()
-        central_widget.setFont(config.get_interface_font())
+        central_widget.setFont(self.interface_font)
         self.setCentralWidget(central_widget)
         main_layout = QVBoxLayout(central_widget)
         main_layout.setContentsMargins(8, 8, 8, 8)
@@ -165,40 +286,41 @@ class QueryEditor(QMainWindow):
         main_layout.addLayout(top_bar_layout)
 
         self.new_mail_button = QPushButton("New Mail")
-        self.new_mail_button.setFont(config.get_interface_font())
+        self.new_mail_button.setFont(self.interface_font)
         top_bar_layout.addWidget(self.new_mail_button)
         self.new_mail_button.clicked.connect(self.new_mail_action)
         
         self.edit_drafts_button = QPushButton("Edit Draft")
-        self.edit_drafts_button.setFont(config.get_interface_font())
+        self.edit_drafts_button.setFont(self.interface_font)
         self.edit_drafts_button.clicked.connect(self.edit_drafts_action)
         top_bar_layout.addWidget(self.edit_drafts_button)
         
         top_bar_layout.addStretch()
 
         self.edit_config_button = QPushButton("Edit Config")
-        self.edit_config_button.setFont(config.get_interface_font())
+        self.edit_config_button.setFont(self.interface_font)
         self.edit_config_button.clicked.connect(self.edit_config_action)
         top_bar_layout.addWidget(self.edit_config_button)
         
         top_bar_layout.addStretch()
         
         self.quit_button = QPushButton("Quit")
-        self.quit_button.setFont(config.get_interface_font())
+        self.quit_button.setFont(self.interface_font)
         self.quit_button.clicked.connect(self.close)
         top_bar_layout.addWidget(self.quit_button)
         
-        # Set up the table with 3 columns now
-        self.query_table = QTableWidget()
-        self.query_table.setColumnCount(3)
-        self.query_table.setHorizontalHeaderLabels(["Name", "Query Expression", "Move"])
+        # Set up the table with 3 columns now; the view only asks the model
+        # for the cells it actually shows
+        self.query_table = QTableView()
+        self.query_model = QueryTableModel(self.text_font, self)
+        self.query_table.setModel(self.query_model)
         self.query_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.ResizeToContents)
         self.query_table.horizontalHeader().setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)
         self.query_table.horizontalHeader().setSectionResizeMode(2, QHeaderView.ResizeMode.Fixed)
         self.query_table.setColumnWidth(2, 40)  # Narrow handle column
         self.query_table.horizontalHeader().setVisible(False)
         self.query_table.verticalHeader().setVisible(False)
-        self.query_table.setFont(config.get_text_font())
+        self.query_table.setFont(self.text_font)
         
         # Configure editing triggers
         self.query_table.setEditTriggers(
@@ -222,24 +344,24 @@ class QueryEditor(QMainWindow):
         self.query_table.setItemDelegateForColumn(2, self.drag_handle_delegate)
         
         # Connect signals
-        self.query_table.cellChanged.connect(self.handle_cell_changed)
-        self.query_table.cellDoubleClicked.connect(self.handle_cell_double_clicked)
+        self.query_model.dataChanged.connect(self.handle_data_changed)
+        self.query_table.doubleClicked.connect(self.handle_cell_double_clicked)
         
         # Install event filter to track mouse position
         self.query_table.viewport().installEventFilter(self)
         
         # Remove the blue selection highlight with stylesheet
         self.query_table.setStyleSheet("""
-            QTableWidget {
+            QTableView {
                 selection-background-color: transparent;
                 outline: none; /* Remove focus outline */
             }
-            QTableWidget::item:selected {
+            QTableView::item:selected {
                 background-color: transparent;
                 color: black; /* Keep text color normal */
                 border: 1px solid #888; /* Subtle border to show selection */
             }
-            QTableWidget::item:focus {
+            QTableView::item:focus {
                 background-color: transparent;
                 border: 1px solid #888;
             }
@@ -289,59 +411,17 @@ class QueryEditor(QMainWindow):
         # Row already moved by preview, just finalize
         event.acceptProposedAction()
         self.dragging_row = -1
-        self.save_queries_from_table()
+        self.save_timer.start()
 
     def previewRowMove(self, target_row):
-        """Show real-time preview of row movement (adapted for QTableWidget)."""
+        """Show real-time preview of row movement; the dragged row takes the target's place."""
         if self.dragging_row <= 0 or target_row <= 0 or self.dragging_row == target_row:
             return
         
-        # Set flag to prevent save during preview
-        self.is_moving_row = True
-        
-        try:
-            # Save row data using takeItem()
-            row_data = []
-            for col in range(3):  # Now 3 columns
-                item = self.query_table.takeItem(self.dragging_row, col)
-                row_data.append(item)
-            
-            # Also save any cell widgets
-            widgets = []
-            for col in range(3):
-                widget = self.query_table.cellWidget(self.dragging_row, col)
-                if widget:
-                    self.query_table.removeCellWidget(self.dragging_row, col)
-                    widgets.append(widget)
-                else:
-                    widgets.append(None)
-            
-            # Remove old row
-            self.query_table.removeRow(self.dragging_row)
-            
-            # Adjust target if needed
-            if target_row > self.dragging_row:
-                target_row -= 1
-            
-            # Insert at new position
-            self.query_table.insertRow(target_row)
-            for col, item in enumerate(row_data):
-                if item:
-                    self.query_table.setItem(target_row, col, item)
-                else:
-                    # Create empty item for handle column
-                    self.query_table.setItem(target_row, col, QTableWidgetItem(""))
-            
-            for col, widget in enumerate(widgets):
-                if widget:
-                    self.query_table.setCellWidget(target_row, col, widget)
-            
+        if self.query_model.move_row(self.dragging_row, target_row):
             # Update tracking
             self.dragging_row = target_row
             self.query_table.selectRow(target_row)
-        
-        finally:
-            self.is_moving_row = False
 
     def eventFilter(self, obj, event):
         """Track mouse position and force immediate edit mode on click."""
@@ -363,7 +443,7 @@ class QueryEditor(QMainWindow):
                     
                     if row >= 0 and column >= 0:
                         # Check for potential double click by looking at time since last click
-                        current_time = int(time.time() * 1000)  # Current time in milliseconds
+                        current_time = event.timestamp()  # Event time in milliseconds
                         
                         # If this is within double-click interval, don't start edit mode yet
                         if (current_time - self.last_click_time < self.double_click_interval and 
@@ -446,7 +526,7 @@ class QueryEditor(QMainWindow):
         
         # Create context menu
         context_menu = QMenu(self)
-        context_menu.setFont(config.get_menu_font())
+        context_menu.setFont(self.menu_font)
         
         # Add actions (removed move actions)
         execute_action = QAction("Execute", self)
@@ -470,10 +550,10 @@ class QueryEditor(QMainWindow):
         """Delete the row that was right-clicked without confirmation."""
         if self.context_menu_row > 0:  # Ensure we're not deleting the empty input row
             # Remove the row directly without confirmation
-            self.query_table.removeRow(self.context_menu_row)
+            self.query_model.removeRow(self.context_menu_row)
             
             # Save the changes
-            self.save_queries_from_table()
+            self.save_timer.start()
             
             # Reset context menu position
             self.context_menu_row = -1
@@ -482,11 +562,7 @@ class QueryEditor(QMainWindow):
     def edit_row(self):
         """Start editing the cell that was right-clicked."""
         if self.context_menu_row > 0 and self.context_menu_column >= 0:
-            # Get the item
-            item = self.query_table.item(self.context_menu_row, self.context_menu_column)
-            if item:
-                # Edit the item
-                self.query_table.editItem(item)
+            self.query_table.edit(self.query_model.index(self.context_menu_row, self.context_menu_column))
 
     def execute_row(self):
         """Execute the query in the row that was right-clicked (same as double-click)."""
@@ -501,14 +577,14 @@ class QueryEditor(QMainWindow):
             self.is_double_click_pending = False
             return
             
-        # Make sure the item exists
-        item = self.query_table.item(row, column)
-        if item:
-            # Start editing the item
-            self.query_table.editItem(item)
+        # Make sure the cell exists and is editable
+        index = self.query_model.index(row, column)
+        if index.isValid() and index.flags() & Qt.ItemFlag.ItemIsEditable:
+            # Start editing the cell
+            self.query_table.edit(index)
             
             # Get the editor and ensure no text is selected
-            editor = self.query_table.indexWidget(self.query_table.model().index(row, column))
+            editor = self.query_table.indexWidget(index)
             if isinstance(editor, QLineEdit):
                 editor.deselect()
                 
@@ -519,49 +595,16 @@ class QueryEditor(QMainWindow):
 
     def load_queries_into_table(self):
         """Loads named queries from the parser into the table and adds an empty row at the top."""
-        queries = self.query_parser.queries
-        
-        # Set row count to include queries plus one empty row at the top
-        row_count = len(queries) + 1
-        self.query_table.setRowCount(row_count)
-        
-        # Temporarily disconnect the signal to avoid repeated saves during loading
-        self.query_table.cellChanged.disconnect(self.handle_cell_changed)
+        self.query_model.set_queries(self.query_parser.queries)
+        # What is on disk now; saving the same content again is skipped
+        self.saved_queries_json = json.dumps({"queries": self.query_model.queries_to_save()})
         
-        # Add the empty row at the top (index 0)
+        # The input row (index 0) holds the line edits for new queries
         self.add_empty_row_at_top()
-        
-        # Load the rest of the queries starting from index 1
-        for i, (name, query) in enumerate(queries):
-            row = i + 1  # Start at row 1, after the empty row
-            
-            name_item = QTableWidgetItem(name)
-            name_item.setFont(config.get_text_font())
-            self.query_table.setItem(row, 0, name_item)
-            
-            query_item = QTableWidgetItem(query)
-            query_item.setFont(config.get_text_font())
-            self.query_table.setItem(row, 1, query_item)
-            
-            # Add empty item for handle column
-            handle_item = QTableWidgetItem("")
-            self.query_table.setItem(row, 2, handle_item)
-            
-        # Reconnect the signal
-        self.query_table.cellChanged.connect(self.handle_cell_changed)
-
 
     def add_new_rule(self, label, query):
-        self.query_table.insertRow(1)
-        label_item = QTableWidgetItem(label)
-        label_item.setFont(config.get_text_font())
-        self.query_table.setItem(1, 0, label_item)
-        query_item = QTableWidgetItem(query)
-        query_item.setFont(config.get_text_font())
-        self.query_table.setItem(1, 1, query_item)
-        # Add empty item for handle column
-        handle_item = QTableWidgetItem("")
-        self.query_table.setItem(1, 2, handle_item)
+        self.query_model.insert_query(1, label, query)
+        self.save_timer.start()
 
     def handle_new_label(self,editor):
         new_label = editor.text().strip()
@@ -576,55 +619,28 @@ class QueryEditor(QMainWindow):
         editor.clear()
 
     def add_empty_row_at_top(self):
-        """Adds an empty row at the top of the table."""
+        """Puts the input line edits into the empty row at the top of the table."""
         label_editor = QLineEdit()
         label_editor.setPlaceholderText("label")
-        self.query_table.setCellWidget(0, 0, label_editor)
+        self.query_table.setIndexWidget(self.query_model.index(0, 0), label_editor)
         label_editor.returnPressed.connect(lambda: self.handle_new_label(label_editor))
 
         # Right column: Query
         query_editor = QLineEdit()
         query_editor.setPlaceholderText("new search expression")
-        self.query_table.setCellWidget(0, 1, query_editor)
+        self.query_table.setIndexWidget(self.query_model.index(0, 1), query_editor)
         query_editor.returnPressed.connect(lambda: self.handle_new_query(query_editor))
-        
-        # Handle column: empty (will show drag handle via delegate for other rows)
-        self.query_table.setItem(0, 2, QTableWidgetItem(""))
 
-    def handle_cell_changed(self, row, column):
-        """Handles cell changes and creates a new row if needed."""
-        # Check if we're already processing a change to avoid recursion
-        if self.is_processing_cell_change or self.is_moving_row:
+    def handle_data_changed(self, top_left, bottom_right, roles=()):
+        """Saves the queries when the text of a cell was edited."""
+        # Font updates only change how the rows look
+        if roles and Qt.ItemDataRole.DisplayRole not in roles and Qt.ItemDataRole.EditRole not in roles:
             return
-            
-        self.is_processing_cell_change = True
-        
-        try:
-            # Get the items from the changed row (only first two columns matter)
-            name_item = self.query_table.item(row, 0)
-            query_item = self.query_table.item(row, 1)
-            
-            name = name_item.text().strip() if name_item else ""
-            query = query_item.text().strip() if query_item else ""
-            
-            # If the top row (row 0) was changed and has content, add a new empty row
-            if row == 0 and (name or query):
-                # Insert a new empty row at the top
-                self.query_table.insertRow(0)
-                
-                # Add empty items to the new top row
-                self.add_empty_row_at_top()
-                
-                # Update the UI to reflect the change
-                self.query_table.update()
-            
-            # Save all queries
-            self.save_queries_from_table()
-        finally:
-            self.is_processing_cell_change = False
+        self.save_timer.start()
 
-    def handle_cell_double_clicked(self, row, column):
+    def handle_cell_double_clicked(self, index):
         """Handles double click event - opens query results."""
+        row, column = index.row(), index.column()
         # Skip the top empty row and handle column
         if row == 0 or column == self.handle_column:
             return
@@ -632,25 +648,32 @@ class QueryEditor(QMainWindow):
         # Open the query results
         self.open_query_results(row, column)
 
+    def flush_pending_save(self):
+        """Writes the queries now if a delayed save is still pending."""
+        if self.save_timer.isActive():
+            self.save_timer.stop()
+            self.save_queries_from_table()
+
     def save_queries_from_table(self):
         """Saves the contents of the table back to the queries file, skipping the empty top row."""
-        queries_to_save = []
+        # Only non-empty rows are saved
+        queries_to_save = self.query_model.queries_to_save()
         
-        # Start from row 1 to skip the empty top row
-        for row in range(1, self.query_table.rowCount()):
-            name_item = self.query_table.item(row, 0)
-            query_item = self.query_table.item(row, 1)
-            
-            name = name_item.text().strip() if name_item else ""
-            query = query_item.text().strip() if query_item else ""
-            
-            # Only save non-empty rows
-            if name or query:
-                queries_to_save.append([name, query])
+        queries_json = json.dumps({"queries": queries_to_save})
+        if queries_json == self.saved_queries_json:
+            return
         
         try:
-            with open(self.query_parser.queries_path, "w") as f:
-                json.dump({"queries": queries_to_save}, f)
+            # Write next to the target and rename over it, so a crash or a
+            # concurrent reader never sees a truncated file
+            path = self.query_parser.queries_path
+            tmp = path.with_suffix(".json.tmp")
+            with open(tmp, "w") as f:
+                f.write(queries_json)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, path)
+            self.saved_queries_json = queries_json
             logging.info("Queries saved successfully.")
         except Exception as e:
             logging.error(f"Failed to save queries: {e}")
@@ -664,11 +687,7 @@ class QueryEditor(QMainWindow):
         if row == 0:
             return
             
-        name_item = self.query_table.item(row, 0)
-        query_item = self.query_table.item(row, 1)
-
-        name = name_item.text().strip() if name_item else ""
-        query_expression = query_item.text().strip() if query_item else ""
+        name, query_expression = self.query_model.query_at(row)
         
         if not query_expression:
             return # Don't open an empty query
@@ -679,6 +698,8 @@ class QueryEditor(QMainWindow):
         else:
             final_query = query_expression
         
+        # The results window expands named queries from the saved file
+        self.flush_pending_save()
         try:
             get_run_method( "show-query-results" )( final_query )
             logging.info(f"Launched query viewer with query: {final_query}")
@@ -701,7 +722,7 @@ class QueryEditor(QMainWindow):
             return
 
         menu = QMenu(self)
-        menu.setFont(config.get_menu_font())
+        menu.setFont(self.menu_font)
         for identity in identities:
             action_text = f"From: {identity.get('name', '')} <{identity.get('email', '')}>"
             action = menu.addAction(action_text)
@@ -721,23 +742,22 @@ class QueryEditor(QMainWindow):
 
     def _on_config_changed(self):
         """Reapply fonts and relayout after config changes."""
+        self.interface_font = config.get_interface_font()
+        self.menu_font = config.get_menu_font()
+        self.text_font = config.get_text_font()
         central_widget = self.centralWidget()
         if central_widget:
-            central_widget.setFont(config.get_interface_font())
-        self.new_mail_button.setFont(config.get_interface_font())
-        self.edit_drafts_button.setFont(config.get_interface_font())
-        self.edit_config_button.setFont(config.get_interface_font())
-        self.quit_button.setFont(config.get_interface_font())
-        self.query_table.setFont(config.get_text_font())
-        # Update font on existing items and set uniform row heights
-        text_font = config.get_text_font()
-        fm = QFontMetrics(text_font)
+            central_widget.setFont(self.interface_font)
+        self.new_mail_button.setFont(self.interface_font)
+        self.edit_drafts_button.setFont(self.interface_font)
+        self.edit_config_button.setFont(self.interface_font)
+        self.quit_button.setFont(self.interface_font)
+        self.query_table.setFont(self.text_font)
+        # Update the font the model hands out and set uniform row heights
+        self.query_model.set_font(self.text_font)
+        fm = QFontMetrics(self.text_font)
         row_height = fm.height() + 4
-        for row in range(self.query_table.rowCount()):
-            for col in range(2):
-                item = self.query_table.item(row, col)
-                if item:
-                    item.setFont(text_font)
+        for row in range(self.query_model.rowCount()):
             self.query_table.setRowHeight(row, row_height)
         # Recreate delegate to pick up new font
         self.text_delegate = NoSelectTextDelegate()
@@ -747,6 +767,8 @@ class QueryEditor(QMainWindow):
         self.query_table.setItemDelegateForColumn(2, self.drag_handle_delegate)
 
     def closeEvent(self, event):
+        # Write a save that is still pending before the window goes away
+        self.flush_pending_save()
         Config.unregister_callback(self._on_config_changed)
         super().closeEvent(event)
 
@@ -233,7 +233,7 @@ def apply_tag_to_query(pm_tag, query, flag_error):
             operation = pm_tag[0]
             tag_name = pm_tag[1:]
             
-            print(f"applying tag = {pm_tag} to query = {query}")
+            logging.debug("applying tag = %s to query = %s", pm_tag, query)
             
             messages = db.messages(query)
             for msg in messages:
@@ -250,6 +250,36 @@ def apply_tag_to_query(pm_tag, query, flag_error):
         sys.exit(1)
 
 
+def apply_tags_to_query(pm_tags, query, flag_error):
+    """
+    Apply several tag operations to all messages matching query, using one
+    database handle and one atomic transaction.
+    pm_tags: list of '+tag' / '-tag' strings
+    """
+    try:
+        for pm_tag in pm_tags:
+            if not pm_tag or len(pm_tag) < 2 or pm_tag[0] not in '+-':
+                raise ValueError(f"Invalid tag format: {pm_tag}")
+
+        with notmuch2.Database(mode=notmuch2.Database.MODE.READ_WRITE) as db:
+            logging.debug("applying tags = %s to query = %s", " ".join(pm_tags), query)
+
+            with db.atomic():
+                for msg in db.messages(query):
+                    # Freeze so each message's tags are written once
+                    with msg.frozen():
+                        for pm_tag in pm_tags:
+                            if pm_tag[0] == '+':
+                                msg.tags.add(pm_tag[1:])
+                            else:
+                                msg.tags.discard(pm_tag[1:])
+
+    except Exception as e:
+        _call_error_callback(flag_error, "Notmuch Query Failed",
+                            f"An error occurred while running notmuch:\n\n{e}")
+        sys.exit(1)
+
+
 def get_tags_from_query(query, flag_error):
     """
     Get all unique tags from messages matching the query.
@@ -281,8 +311,7 @@ def update_unseen_from_query(query, flag_error):
     tags = get_tags_from_query(query, flag_error)
     if '$unseen' in tags:
         logging.info("Found '$unseen' tag. Silently replacing with '$unused'.")
-        apply_tag_to_query('+$unused', query, flag_error)
-        apply_tag_to_query('-$unseen', query, flag_error)
+        apply_tags_to_query(['+$unused', '-$unseen'], query, flag_error)
 
 
 def _call_error_callback(flag_error, title, message):
@@ -123,7 +123,7 @@ def apply_tag_to_query(pm_tag, query, flag_error):
             '--',
             f"{query}"
         ]
-        print(f"applying tag = {pm_tag} to query = {query}" )
+        logging.debug("applying tag = %s to query = %s", pm_tag, query)
         result = subprocess.run(command, check=True)
 
     except subprocess.CalledProcessError as e:
@@ -140,12 +140,39 @@ def apply_tag_to_query(pm_tag, query, flag_error):
         )
         raise
 
+def apply_tags_to_query(pm_tags, query, flag_error):
+    # notmuch tag <pm_tag> <pm_tag> ... -- <query>, all in one invocation
+    try:
+        command = ['notmuch', 'tag'] + list(pm_tags) + ['--', f"{query}"]
+        logging.debug("applying tags = %s to query = %s", " ".join(pm_tags), query)
+        result = subprocess.run(command, check=True)
+
+    except subprocess.CalledProcessError as e:
+        flag_error(
+            "Notmuch Query Failed",
+            f"An error occurred while running notmuch:\n\n{e.stderr}"
+        )
+        raise
+
+    except Exception as e:
+        flag_error(
+            "Something happened.",
+            f"Caught Exception: {e}"
+        )
+        raise
+
+def tags_query_command(query):
+    # the extra clauses keep notmuch from excluding spam / postponed mails
+    return ['notmuch', 'search', '--output=tags', '--format=text', f'{query} and (tag:spam or not tag:spam) and (tag:postponed or not tag:postponed)']
+
+def parse_tags_output(output):
+    return sorted(tag.strip() for tag in output.strip().split('\n') if tag.strip())
+
 def get_tags_from_query(query, flag_error):
     try:
-        command = ['notmuch', 'search', '--output=tags', '--format=text', f'{query} and (tag:spam or not tag:spam) and (tag:postponed or not tag:postponed)']
+        command = tags_query_command(query)
         result = subprocess.run(command, capture_output=True, text=True, check=True)            
-        tags_list = [tag.strip() for tag in result.stdout.strip().split('\n') if tag.strip()]
-        tags = sorted(tags_list)
+        tags = parse_tags_output(result.stdout)
     except subprocess.CalledProcessError as e:
         flag_error(
             "Notmuch Command Failed",
@@ -158,7 +185,6 @@ def update_unseen_from_query( query, flag_error ):
     tags = get_tags_from_query( query, flag_error )
     if '$unseen' in tags:
         logging.info("Found '$unseen' tag. Silently replacing with '$unused'.")
-        apply_tag_to_query( '+$unused', query, flag_error )
-        apply_tag_to_query( '-$unseen', query, flag_error )
+        apply_tags_to_query( ['+$unused', '-$unseen'], query, flag_error )
 
 # end of file
@@ -6,7 +6,8 @@ import argparse
 import subprocess
 from pathlib import Path
 from email import policy
-import email.message
+from email.parser import BytesParser
+from itertools import takewhile
 from datetime import datetime
 from email.utils import getaddresses
 import logging
@@ -34,6 +35,9 @@ from common import display_error, create_new_mail_menu, match_address, find_iden
 # Set up basic logging to console
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+# Parsers keep no state between parse calls, so one serves every draft
+_HEADER_PARSER = BytesParser(policy=policy.default)
+
 class DraftsManager(QMainWindow):
     def __init__(self, drafts_dir_path=None, sender_email="", parent=None):
         super().__init__(parent)
@@ -224,9 +228,11 @@ class DraftsManager(QMainWindow):
             valid_draft_files = []
             for file_path in draft_files:
                 try:
-                    # Basic validation - check if file can be opened
+                    # Basic validation - check if file can be opened; only the
+                    # headers are shown, so reading stops at the blank line
                     with open(file_path, 'rb') as f:
-                        msg = email.message_from_binary_file(f, policy=policy.default)
+                        header_bytes = b''.join(takewhile(lambda line: line.strip(b'\r\n'), f))
+                    msg = _HEADER_PARSER.parsebytes(header_bytes, headersonly=True)
                     # If we get here, the file is a valid email file
                     valid_draft_files.append((file_path, msg))
                 except Exception as e:
@@ -11,6 +11,7 @@ import ssl
 import logging
 import shutil
 from email import policy
+from email.parser import BytesFeedParser
 from pathlib import Path
 
 # Set up basic logging to console
@@ -66,8 +67,12 @@ class SendMail:
             return
 
         try:
-            with open(file_path, 'rb') as fp:
-                msg = email.message_from_binary_file(fp, policy=policy.default)
+            # Feed the parser in chunks so no full copy of the file is held
+            parser = BytesFeedParser(policy=policy.default)
+            with open(file_path, 'rb', buffering=0) as fp:
+                while chunk := fp.read(65536):
+                    parser.feed(chunk)
+            msg = parser.close()
             
             from_address = msg.get("From")
             if not from_address:
@@ -1,41 +1,99 @@
 #!/usr/bin/env python3
 
 import sys
-import mailparser
 import argparse
+import atexit
 import os
 import tempfile
+import mmap
+import weakref
+from functools import partial
+from itertools import takewhile
 import email
 from email import policy
 from email.header import Header
+from email.errors import MessageError
+from email.parser import BytesFeedParser
 from email.utils import getaddresses
 import re
 from pathlib import Path
-from PySide6.QtCore import Qt, QSize, QUrl, QRegularExpression, QDate
-from PySide6.QtGui import QFont, QKeySequence, QAction, QTextCursor, QTextCharFormat, QColor, QDesktopServices
+from PySide6.QtCore import Qt, QSize, QUrl, QRegularExpression, QDate, QProcess, QAbstractListModel, QModelIndex, QObject, QRunnable, QThreadPool, Signal
+from PySide6.QtGui import QFont, QKeySequence, QAction, QTextCursor, QTextCharFormat, QColor, QDesktopServices, QTextDocument, QClipboard
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QTextBrowser, QTextEdit, QHBoxLayout,
-    QPushButton, QListWidget, QSplitter, QMessageBox, QMenu, QGroupBox,
+    QPushButton, QListView, QSplitter, QMessageBox, QMenu, QGroupBox,
     QFormLayout, QLabel, QInputDialog, QScrollArea, QDialog, QDialogButtonBox,
     QFileDialog, QSizePolicy, QAbstractItemView, QCalendarWidget
 )
 
-from notmuch_api import find_matching_messages, find_matching_threads, apply_tag_to_query, get_tags_from_query, update_unseen_from_query
+from notmuch_api import find_matching_messages, find_matching_threads, apply_tag_to_query, update_unseen_from_query, tags_query_command, parse_tags_output
 
 import logging
 import subprocess
 import json
 import textwrap
-import base64
 
 from config import config, Config
-from common import display_error, html_to_plain_text, get_db_path, get_run_method
+from common import display_error, html_to_plain_text, get_db_path, get_run_method, write_part_payload, classify_part
 from watcher import DirectoryEventHandler
 from header_widget import MailHeaderWidget
 
 # Set up basic logging to console
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+# A font-size declaration inside a style attribute. The value stops at the end
+# of the declaration or attribute and is bounded, so a missing ';' or quote
+# cannot let one match swallow the rest of the document.
+_FONT_SIZE_RE = re.compile(r'font-size:\s*[^;"\'<>\n]{1,256};?', re.IGNORECASE)
+
+# URLs to turn into links in plain text bodies. A QRegularExpression, because
+# its match offsets are in the same UTF-16 units as QTextCursor positions.
+_URL_RE = QRegularExpression(r'(https?://[^\s<>"]+|www\.[^\s<>"]+|file://[^\s<>"\[\]]+)')
+
+# Domain part of an address in a header value
+_DOMAIN_RE = re.compile(r'@([^>\s]+)')
+
+# Attachments handed to other applications go to tmpfs when they are small
+# enough not to put pressure on memory
+_SHM_DIR = '/dev/shm'
+_SHM_MAX_ATTACHMENT = 64 * 1024 * 1024
+
+# Bodies whose encoded payload is larger than this are decoded on a worker
+# thread; smaller ones decode faster than a placeholder could be shown
+_ASYNC_DECODE_THRESHOLD = 256 * 1024
+
+
+# Parsed messages stay here only while some viewer still holds them
+_message_cache = weakref.WeakValueDictionary()
+
+
+def load_message(path, mtime_ns, size, headers_only=False):
+    """
+    Parses a mail file. Viewers open in the same process share the parse
+    of a file that has not changed; mtime and size are part of the key so an
+    edited file is parsed again. With headers_only, reading stops at the
+    blank line ending the headers and the message has no body.
+    """
+    key = (path, mtime_ns, size, headers_only)
+    message = _message_cache.get(key)
+    if message is None:
+        message = _parse_message(path, headers_only)
+        _message_cache[key] = message
+    return message
+
+
+def _parse_message(path, headers_only):
+    parser = BytesFeedParser(policy=policy.default)
+    if headers_only:
+        with open(path, 'rb') as f:
+            parser.feed(b''.join(takewhile(lambda line: line.strip(b'\r\n'), f)))
+        return parser.close()
+    # Feed the parser in chunks so no full copy of the file is held
+    with open(path, 'rb', buffering=0) as f:
+        while chunk := f.read(65536):
+            parser.feed(chunk)
+    return parser.close()
+
 
 class MailSourceViewer(QDialog):
     """A simple dialog to display the raw content of the mail file."""
@@ -53,13 +111,25 @@ class MailSourceViewer(QDialog):
         self.source_content.setReadOnly(True)
         self.source_content.setTextInteractionFlags(Qt.TextSelectableByMouse | Qt.TextSelectableByKeyboard)
         self.source_content.setFont(config.get_text_font())
+        # Nothing is ever typed or pasted here, so keep no undo history of
+        # the (possibly large) source text
+        self.source_content.setAcceptRichText(False)
+        self.source_content.document().setUndoRedoEnabled(False)
         
         main_layout.addWidget(self.source_content)
 
-        # 2. Load the file content
+        # 2. Load the file content; the text is decoded straight from a
+        # read-only mapping, so no intermediate bytes copy of the file is made
         try:
-            with open(mail_file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                raw_source = f.read()
+            with open(mail_file_path, 'rb') as f:
+                if os.fstat(f.fileno()).st_size:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        raw_source = str(mm, 'utf-8', errors='ignore')
+                else:
+                    raw_source = ""
+            if '\r' in raw_source:
+                # Same newline handling as reading in text mode
+                raw_source = raw_source.replace('\r\n', '\n').replace('\r', '\n')
             self.source_content.setPlainText(raw_source)
         except Exception as e:
             self.source_content.setPlainText(f"Error loading source file: {e}")
@@ -71,51 +141,114 @@ class MailSourceViewer(QDialog):
         main_layout.addWidget(button_box)
 
 
+class DecodeSignals(QObject):
+    finished = Signal(bool, str)
+
+
+class DecodeJob(QRunnable):
+    """Decodes a message body on the thread pool and reports the text back."""
+    def __init__(self, decode, shows_html):
+        super().__init__()
+        self.decode = decode
+        self.shows_html = shows_html
+        self.signals = DecodeSignals()
+
+    def run(self):
+        # Whatever goes wrong, the body pane must not stay on the placeholder
+        try:
+            text = self.decode()
+        except Exception:
+            logging.exception("Failed to decode message body")
+            text = ""
+        self.signals.finished.emit(self.shows_html, text)
+
+
+class AttachmentListModel(QAbstractListModel):
+    """
+    Read-only list model over the attachment parts of a message. The view only
+    asks for the rows it shows, so a file name is looked up when its row first
+    becomes visible instead of for every part up front.
+    """
+    def __init__(self, parts, filename_of, parent=None):
+        super().__init__(parent)
+        self.parts = parts
+        self.filename_of = filename_of
+        self.filenames = {}
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.parts)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role != Qt.DisplayRole:
+            return None
+        row = index.row()
+        filename = self.filenames.get(row)
+        if filename is None:
+            filename = self.filenames[row] = self.filename_of(self.parts[row])
+        return filename
+
+
 class MailViewer(QMainWindow):
-    def __init__(self, mail_file_path, parent=None):
+    def __init__(self, mail_file_path, parent=None, headers_only=False):
         super().__init__(parent)
         self.setWindowTitle("Kubux Mail Client - Viewer")
         self.resize(QSize(1024, 768))
 
         self.mail_file_path = Path(mail_file_path).expanduser()
+        self.headers_only = headers_only
         self.tags = []
+        self._tags_refresh_pending = False
+        self._tags_proc = QProcess(self)
+        self._tags_proc.finished.connect(self._on_tags_proc_finished)
+        self._tags_proc.errorOccurred.connect(self._on_tags_proc_error)
         self.tags_state = {}
         self.show_headers = True
         self.attachments = []
         self.message_id = None
         self.message = None
-        self.mail_body = ""
-        self.mail_html = ""
+        self.text_part = None
+        self.html_part = None
+        self.mail_body = None
+        self.mail_html = None
+        self.quote_body = None
+        self.body_documents = {}
+        self.decode_jobs = {}
+        self.loading_document = None
+        self.parsed_addresses = {}
+        self.opened_attachments = {}
         self.has_text_body = False
         self.has_html_body = False
         self.parse_mail_file()
         self.force_html = False
         self.shows_html = not self.has_text_body
 
-        self.process_initial_tags()
+        # Tags are fetched in the background once the window is built; until
+        # they arrive the tag strip is empty and disabled
+        self._tags_cache = []
+        self._initial_tags_pending = True
         self.setup_ui()
         self.setup_key_bindings()
+        self.update_tags_ui()
         self.display_message()
+        self.refresh_tags_async()
 
-        self.dir_watcher = DirectoryEventHandler( self.update_tags_ui )
+        self.dir_watcher = DirectoryEventHandler( self.on_database_changed )
         self.dir_watcher.watch( get_db_path() )
 
         Config.register_callback(self._on_config_changed)
 
     def render_html_button ( self ):
-        self.toggle_html_button.setFont(config.get_interface_font())
         if self.shows_html:
             self.toggle_html_button.setText("Text")
-            if not self.has_text_body:
-                self.toggle_html_button.setStyleSheet("QPushButton { color: gray; }")
-            else:
-                self.toggle_html_button.setStyleSheet("QPushButton { color: black; }")
+            available = self.has_text_body
         else:
             self.toggle_html_button.setText("Html")
-            if not self.has_html_body:
-                self.toggle_html_button.setStyleSheet("QPushButton { color: gray; }")
-            else:
-                self.toggle_html_button.setStyleSheet("QPushButton { color: black; }")
+            available = self.has_html_body
+        if self.toggle_html_button.property("available") != available:
+            self.toggle_html_button.setProperty("available", available)
+            # Re-evaluate the property selectors without re-parsing the sheet
+            self.toggle_html_button.style().unpolish(self.toggle_html_button)
+            self.toggle_html_button.style().polish(self.toggle_html_button)
 
     def toggle_force_html ( self ):
         self.force_html = not self.force_html
@@ -128,35 +261,110 @@ class MailViewer(QMainWindow):
         if not self.mail_file_path.exists():
             logging.error(f"Mail file {self.mail_file_path} does not exist.")
             raise FileNotFoundError(f"Mail file does not exist: {self.mail_file_path}")
+        stat = self.mail_file_path.stat()
+        max_size = config.get_max_mail_size()
+        if not self.headers_only and max_size and stat.st_size > max_size:
+            # Even a streamed parse keeps every decoded part in memory; let the
+            # user decide before a huge (or hostile) file is read in full
+            answer = QMessageBox.question(
+                None, "Large Mail",
+                f"This mail file is {stat.st_size / (1024 * 1024):.0f} MiB.\n\n"
+                "Load it completely? Otherwise only the headers are shown.",
+                QMessageBox.Yes | QMessageBox.No, QMessageBox.No
+            )
+            if answer != QMessageBox.Yes:
+                self.headers_only = True
         try:
-            mail = mailparser.parse_from_file(self.mail_file_path)
-            with open(self.mail_file_path, 'rb') as f:
-                self.message = email.message_from_binary_file(f, policy=policy.default)
+            self.message = load_message(str(self.mail_file_path), stat.st_mtime_ns, stat.st_size, self.headers_only)
         except Exception as e:
             logging.error(f"Failed to parse mail file: {e}")
             raise RuntimeError(f"Failed to parse mail file {self.mail_file_path}: {e}") from e
         # print("parsing message")
-        for part in self.message.walk():
-            # Prioritize plain text over HTML
-            if part.get_content_type() == 'text/plain' and not self.has_text_body:
-                body_text = part.get_content()
-                self.mail_body = body_text
-                self.has_text_body = True
-            if part.get_content_type() == 'text/html' and not self.has_html_body:
-                body_html = part.get_content()
-                sanitized_html = self.sanitize_html_fonts(body_html)
-                self.mail_html = sanitized_html
-                self.has_html_body = True
-        self.attachments = mail.attachments 
-        # unfortunately not all mail have only one id
-        if isinstance(mail.message_id, list):
-            if not mail.message_id:
-                raise ValueError("Message-ID list is empty.")
-            self.message_id = mail.message_id[0].strip('<>')
-        else:
-            self.message_id = mail.message_id.strip('<>')
-        print(f"Message-ID = {self.message_id}")
-
+        # Without a body there are no body parts or attachments to look for
+        for part in ( () if self.headers_only else self.message.walk() ):
+            if part.is_multipart():
+                continue
+            content_type, is_attachment = classify_part(part)
+            # Attachments are kept as undecoded parts; the payload is only
+            # decoded when the user opens or saves one.
+            if is_attachment:
+                self.attachments.append(part)
+                continue
+            # Remember the first body part of each kind; decoding is deferred
+            # until that body is actually displayed
+            if content_type == 'text/plain' and self.text_part is None:
+                self.text_part = part
+            elif content_type == 'text/html' and self.html_part is None:
+                self.html_part = part
+        self.has_text_body = self.text_part is not None
+        self.has_html_body = self.html_part is not None
+        # unfortunately not all mail have only one id; get() returns the first
+        message_id = self.message.get('Message-ID')
+        if not message_id:
+            # Still viewable; the notmuch actions check for an empty id
+            logging.warning(f"Mail file {self.mail_file_path} has no Message-ID header.")
+        self.message_id = str(message_id or "").strip().strip('<>')
+        logging.debug("Message-ID = %s", self.message_id)
+
+    def decode_mail_body(self):
+        return self.text_part.get_content() if self.text_part is not None else ""
+
+    def decode_mail_html(self):
+        return self.sanitize_html_fonts(self.html_part.get_content()) if self.html_part is not None else ""
+
+    def get_mail_body(self):
+        """Decodes the plain text body on first use."""
+        if self.mail_body is None:
+            self.mail_body = self.decode_mail_body()
+        return self.mail_body
+
+    def get_mail_html(self):
+        """Decodes and sanitizes the HTML body on first use."""
+        if self.mail_html is None:
+            self.mail_html = self.decode_mail_html()
+        return self.mail_html
+
+    def is_body_decoded(self, shows_html):
+        return (self.mail_html if shows_html else self.mail_body) is not None
+
+    def is_large_body(self, shows_html):
+        part = self.html_part if shows_html else self.text_part
+        if part is None:
+            return False
+        payload = part.get_payload()
+        return isinstance(payload, str) and len(payload) > _ASYNC_DECODE_THRESHOLD
+
+    def start_body_decode(self, shows_html):
+        """Decodes a large body on the thread pool; display_message runs again when it is done."""
+        if shows_html in self.decode_jobs:
+            return
+        job = DecodeJob(self.decode_mail_html if shows_html else self.decode_mail_body, shows_html)
+        job.signals.finished.connect(self._on_body_decoded)
+        # Keep the job, and with it the signal object, alive until it reports
+        self.decode_jobs[shows_html] = job
+        QThreadPool.globalInstance().start(job)
+
+    def _on_body_decoded(self, shows_html, text):
+        self.decode_jobs.pop(shows_html, None)
+        if shows_html:
+            if self.mail_html is None:
+                self.mail_html = text
+        elif self.mail_body is None:
+            self.mail_body = text
+        if self.shows_html == shows_html:
+            self.display_message()
+
+    def get_addresses(self, header):
+        """Returns the (name, address) pairs of an address header, parsed once."""
+        addresses = self.parsed_addresses.get(header)
+        if addresses is None:
+            addresses = tuple(getaddresses([self.message.get(header, "")]))
+            self.parsed_addresses[header] = addresses
+        return addresses
+
+    def get_sender_address(self):
+        sender = self.get_addresses("From")
+        return sender[0][1] if sender else ""
 
     def process_initial_tags(self):
         """
@@ -169,6 +377,9 @@ class MailViewer(QMainWindow):
             try:
                 command = ['notmuch', 'tag', '-$unseen', '+$unused', f'id:{self.message_id}']
                 subprocess.run(command, check=True, capture_output=True, text=True)
+                # The outcome is known, so update the cache instead of asking
+                # notmuch again
+                self._tags_cache = sorted((set(current_tags) - {'$unseen'}) | {'$unused'})
             except subprocess.CalledProcessError as e:
                 logging.error(f"Failed to process initial tags: {e.stderr}")
 
@@ -190,14 +401,8 @@ class MailViewer(QMainWindow):
         self.compose_button.setFont(config.get_interface_font())
         self.compose_menu = QMenu(self)
         self.compose_menu.setFont(config.get_menu_font())
-        self.compose_menu.addAction("Reply").triggered.connect(self.reply)
-        self.compose_menu.addAction("Reply All").triggered.connect(self.reply_all)
-        self.compose_menu.addAction("Follow Up").triggered.connect(self.follow_up)
-        self.compose_menu.addAction("Forward").triggered.connect(self.forward)
-        self.compose_menu.addAction("Forward (cc all)").triggered.connect(self.forward_cc)
-        self.compose_menu.addAction("Reply to Selected").triggered.connect(self.reply_to_selected)
-        self.compose_menu.addSeparator()
-        self.compose_menu.addAction("Compose New").triggered.connect(self.compose_new)
+        # Filled when first opened; many viewers never open it
+        self.compose_menu.aboutToShow.connect(self.populate_compose_menu)
         self.compose_button.setMenu(self.compose_menu)
         top_bar_layout.setContentsMargins(0, 0, 0, 0)
         top_bar_layout.addWidget(self.compose_button)
@@ -207,20 +412,7 @@ class MailViewer(QMainWindow):
         self.tags_button.setFont(config.get_interface_font())
         self.tags_menu = QMenu(self)
         self.tags_menu.setFont(config.get_menu_font())
-        for tag in config.get_tags():
-            l = lambda checked, dummy=f"{tag}": self.really_toggle_tag( dummy )
-            action = self.tags_menu.addAction(f"+/- {tag}")
-            action.triggered.connect( l )
-        self.tags_menu.addSeparator()
-        for tag in config.get_status_tags():
-            l = lambda checked, dummy=f"{tag}": self.really_toggle_tag( dummy )
-            action = self.tags_menu.addAction(f"+/- {tag}")
-            action.triggered.connect( l )
-        self.tags_menu.addSeparator()
-        self.tags_menu.addAction("+/- spam").triggered.connect( lambda: self.really_toggle_tag("spam") )
-        self.tags_menu.addAction("+/- deleted").triggered.connect( lambda: self.really_toggle_tag("deleted") )
-        self.tags_menu.addSeparator()
-        self.tags_menu.addAction("Add Tags").triggered.connect( lambda: self.add_tag_dialog() )
+        self.tags_menu.aboutToShow.connect(self.populate_tags_menu)
         self.tags_button.setMenu(self.tags_menu)
         top_bar_layout.addWidget(self.tags_button)
 
@@ -236,6 +428,11 @@ class MailViewer(QMainWindow):
         top_bar_layout.addWidget(self.toggle_header_visibility_button)
         
         self.toggle_html_button =  QPushButton("Html")
+        self.toggle_html_button.setFont(config.get_interface_font())
+        # Grayed out when the other format is missing; render_html_button()
+        # only flips the "available" property
+        self.toggle_html_button.setStyleSheet(
+            'QPushButton[available="false"] { color: gray; } QPushButton[available="true"] { color: black; }' )
         self.toggle_html_button.clicked.connect(self.toggle_force_html)
         top_bar_layout.addWidget(self.toggle_html_button)
         self.render_html_button()
@@ -263,6 +460,8 @@ class MailViewer(QMainWindow):
         self.tags_scroll_area.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAsNeeded)
         self.tags_scroll_area.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
         self.tags_scroll_area.setFixedHeight(40) # Set a fixed, minimal height
+        # One stylesheet for all tag buttons, keyed off their "attached" property
+        self.tags_scroll_area.setStyleSheet('QPushButton[attached="false"] { color: gray; }')
 
         tags_container = QWidget()
         self.tags_layout = QHBoxLayout(tags_container)
@@ -284,39 +483,54 @@ class MailViewer(QMainWindow):
         self.mail_content = QTextBrowser()
         self.mail_content.setFont(config.get_text_font())
         self.mail_content.setReadOnly(True)
-        self.mail_content.setFont(config.get_text_font())
         self.mail_content.setOpenLinks(False) 
         self.splitter.addWidget(self.mail_content)
         self.mail_content.anchorClicked.connect(self.handle_link_clicked)
         self.mail_content.setTextInteractionFlags(Qt.TextBrowserInteraction)
         
         # Add a context menu for clipboard actions and view raw
+        self.content_menu = QMenu(self)
+        self.content_menu.setFont(config.get_menu_font())
+        self.content_menu.addAction("Copy").triggered.connect(self.copy_selection_to_clipboard)
+        self.content_menu.addSeparator()
+        self.content_menu.addAction("View Raw Message").triggered.connect(
+            partial(self.show_mock_action, "Raw message will be opened in $EDITOR.") )
         self.mail_content.setContextMenuPolicy(Qt.CustomContextMenu)
         self.mail_content.customContextMenuRequested.connect(self.show_content_context_menu)
 
         # Attachments list
         if self.attachments:
-            self.attachments_list = QListWidget()
+            self.attachments_list = QListView()
+            # Every row is one line of text, so the view can lay out and
+            # scroll without measuring each item
+            self.attachments_list.setUniformItemSizes(True)
             self.attachments_list.setFont(config.get_attachment_font())
             self.attachments_list.setMinimumHeight(40)
             self.attachments_list.setMaximumHeight(200)
             self.attachments_list.setSelectionMode(QAbstractItemView.NoSelection)
             self.attachments_list.setMouseTracking(True)
             self.attachments_list.setStyleSheet("""
-                QListWidget::item:hover {
+                QListView::item:hover {
                     background-color: #418be6; /* Your preferred blue */
                     color: white;
                 }
             """)
             self.splitter.addWidget(self.attachments_list)
             
-            # Set context menu policy for the attachments list
+            # Set context menu policy for the attachments list; the menu is
+            # built once and told which row it acts on when it pops up
+            self.attachment_menu_row = None
+            self.attachment_menu = QMenu(self)
+            self.attachment_menu.setFont(config.get_menu_font())
+            self.attachment_menu.addAction("Open").triggered.connect(
+                lambda: self.handle_attachment_open(self.attachment_menu_row) )
+            self.attachment_menu.addAction("Save As...").triggered.connect(
+                lambda: self.handle_attachment_save_as(self.attachment_menu_row) )
             self.attachments_list.setContextMenuPolicy(Qt.CustomContextMenu)
             self.attachments_list.customContextMenuRequested.connect(self.show_attachment_context_menu)
 
-            for part in self.attachments:
-                print(f"attachment {part.keys()}")
-                self.attachments_list.addItem(part.get('filename'))
+            self.attachments_model = AttachmentListModel(self.attachments, self.get_attachment_filename, self)
+            self.attachments_list.setModel(self.attachments_model)
 
             self.splitter.setSizes([100, 500, 50])
         else:
@@ -343,48 +557,102 @@ class MailViewer(QMainWindow):
             "reply": self.reply,
             "reply_all": self.reply_all,
             "forward": self.forward,
-            "edit_tags": lambda: self.show_mock_action("Edit Tags action triggered by key binding."),
+            "edit_tags": partial(self.show_mock_action, "Edit Tags action triggered by key binding."),
             "zoom_in": lambda: self.mail_content.zoomIn(1),
             "zoom_out": lambda: self.mail_content.zoomOut(1),
             "select_all": self.mail_content.selectAll
         }
 
+        quoting_actions = {"reply", "reply_all", "forward"}
+
         for name, func in actions.items():
             key_seq = config.get_keybinding(name)
             if key_seq:
                 action = QAction(self)
                 action.setShortcut(QKeySequence(key_seq))
                 action.triggered.connect(func)
+                # Same as the compose menu: no quoting without the body
+                action.setEnabled(not (self.headers_only and name in quoting_actions))
                 self.addAction(action)
 
    
+    def populate_compose_menu(self):
+        if not self.compose_menu.isEmpty():
+            return
+        quoting_actions = [
+            ("Reply", self.reply),
+            ("Reply All", self.reply_all),
+            ("Follow Up", self.follow_up),
+            ("Forward", self.forward),
+            ("Forward (cc all)", self.forward_cc),
+            ("Reply to Selected", self.reply_to_selected),
+        ]
+        for label, slot in quoting_actions:
+            action = self.compose_menu.addAction(label)
+            action.triggered.connect(slot)
+            # Without the body these drafts would silently lose its content
+            action.setEnabled(not self.headers_only)
+        self.compose_menu.addSeparator()
+        self.compose_menu.addAction("Compose New").triggered.connect(self.compose_new)
+
+    def populate_tags_menu(self):
+        if not self.tags_menu.isEmpty():
+            return
+        for tag in config.get_tags():
+            action = self.tags_menu.addAction(f"+/- {tag}")
+            action.triggered.connect( partial(self.really_toggle_tag, tag) )
+        self.tags_menu.addSeparator()
+        for tag in config.get_status_tags():
+            action = self.tags_menu.addAction(f"+/- {tag}")
+            action.triggered.connect( partial(self.really_toggle_tag, tag) )
+        self.tags_menu.addSeparator()
+        self.tags_menu.addAction("+/- spam").triggered.connect( partial(self.really_toggle_tag, "spam") )
+        self.tags_menu.addAction("+/- deleted").triggered.connect( partial(self.really_toggle_tag, "deleted") )
+        self.tags_menu.addSeparator()
+        self.tags_menu.addAction("Add Tags").triggered.connect( self.add_tag_dialog )
+
     def display_message(self):
         if not self.message:
             return
 
-        self.update_tags_ui()
-
-        if self.shows_html:
-            self.mail_content.setHtml(self.mail_html)
-        else:
-            cursor = self.mail_content.textCursor()
-            cursor.setCharFormat(QTextCharFormat())
-            self.mail_content.setTextCursor(cursor)
-            self.mail_content.setPlainText(self.mail_body)
-            # For plain text, we need to detect URLs manually
-            self.highlight_urls_in_plain_text()
+        # Each rendering of the body is built once; toggling between text
+        # and html swaps the finished document back in
+        document = self.body_documents.get(self.shows_html)
+        if document is None and self.headers_only:
+            # Say so, rather than show what looks like an empty mail
+            document = QTextDocument(self.mail_content)
+            document.setDefaultFont(self.mail_content.font())
+            document.setPlainText("Only the headers of this mail were loaded.")
+            self.body_documents[self.shows_html] = document
+        if document is None and not self.is_body_decoded(self.shows_html) and self.is_large_body(self.shows_html):
+            # Keep the window responsive while a large body decodes
+            if self.loading_document is None:
+                self.loading_document = QTextDocument("Loading…", self.mail_content)
+            self.mail_content.setDocument(self.loading_document)
+            self.start_body_decode(self.shows_html)
+            return
+        if document is None:
+            # Fill a detached document and swap it in when complete, so the
+            # view lays out the body once instead of after every change
+            document = QTextDocument(self.mail_content)
+            # The body is read-only; without an undo stack the URL formatting
+            # below does not record an undo step per link
+            document.setUndoRedoEnabled(False)
+            document.setDefaultFont(self.mail_content.font())
+            if self.shows_html:
+                document.setHtml(self.get_mail_html())
+            else:
+                document.setPlainText(self.get_mail_body())
+                # For plain text, we need to detect URLs manually
+                self.highlight_urls_in_plain_text(document)
+            self.body_documents[self.shows_html] = document
+        elif document.defaultFont() != self.mail_content.font():
+            # The text font changed while this document was not shown
+            document.setDefaultFont(self.mail_content.font())
+        self.mail_content.setDocument(document)
         
-    def highlight_urls_in_plain_text(self):
+    def highlight_urls_in_plain_text(self, document):
         """Find and highlight URLs in plain text content."""
-        # Comprehensive URL regex pattern
-        url_pattern = r'(https?://[^\s<>"]+|www\.[^\s<>"]+|file://[^\s<>"\[\]]+)'
-        
-        # Create a QRegularExpression for matching
-        url_regex = QRegularExpression(url_pattern)
-        
-        # Get the document from the QTextEdit
-        document = self.mail_content.document()
-        
         # Create a base format for highlighting URLs (no AnchorHref yet)
         base_url_format = QTextCharFormat()
         base_url_format.setForeground(QColor("#0000FF"))  # Blue color for links
@@ -392,16 +660,14 @@ class MailViewer(QMainWindow):
         base_url_format.setAnchor(True)
         base_url_format.setToolTip("Click to open link")
         
-        # Start finding all matches in the document
+        # Find all matches in one scan; formatting does not change the text,
+        # so it is extracted and handed to Qt only once
         cursor = QTextCursor(document)
+        matches = _URL_RE.globalMatch(document.toPlainText())
         
-        while not cursor.isNull() and not cursor.atEnd():
-            # Search for the URL pattern
-            match = url_regex.match(document.toPlainText(), cursor.position())
+        while matches.hasNext():
+            match = matches.next()
             
-            if not match.hasMatch():
-                break
-                
             # Get the matched URL
             url = match.captured(0)
             start = match.capturedStart(0)
@@ -416,9 +682,6 @@ class MailViewer(QMainWindow):
             
             # Apply URL format
             cursor.setCharFormat(match_format)
-            
-            # Update the cursor position to search for the next match
-            cursor.setPosition(end)
     
 
     def handle_link_clicked(self, url):
@@ -457,7 +720,7 @@ class MailViewer(QMainWindow):
     def extract_domain_from_header(self, header_value):
         """Extract domain from email address in header."""
         # Simple regex to extract domain from email
-        match = re.search(r'@([^>\s]+)', header_value)
+        match = _DOMAIN_RE.search(header_value)
         if match:
             return match.group(1)
         return None
@@ -466,10 +729,11 @@ class MailViewer(QMainWindow):
     def sanitize_html_fonts(self, html_content: str) -> str:
         """Removes hardcoded font-size declarations from HTML to allow Qt to scale the font."""
         # This regex finds any font-size declaration in a style attribute and removes it.
-        return re.sub(r'font-size:\s*[^;"]+;?', '', html_content, flags=re.IGNORECASE)
+        return _FONT_SIZE_RE.sub('', html_content)
 
     def delete_message(self):
-        self.add_tag("deleted")
+        # The window closes right away, so skip the tag refresh
+        self.add_tags(["deleted"], refresh=False)
         self.close()
 
     def update_postpone_button(self):
@@ -507,8 +771,7 @@ class MailViewer(QMainWindow):
             display_error(self, "Failed to Unpostpone", f"Failed to unpostpone message:\n\n{e.stderr}")
             return
 
-        self.update_postpone_button()
-        self.update_tags_ui()
+        self.refresh_tags_async()
 
     def postpone_message(self):
         """Opens a calendar dialog to pick a date, then adds postpone + $until tags."""
@@ -548,8 +811,7 @@ class MailViewer(QMainWindow):
             display_error(self, "Failed to Postpone", f"Failed to postpone message:\n\n{e.stderr}")
             return
 
-        self.update_postpone_button()
-        self.update_tags_ui()
+        self.refresh_tags_async()
 
     def view_thread(self):
         if self.message_id:
@@ -576,20 +838,69 @@ class MailViewer(QMainWindow):
             raise RuntimeError(f"Failed to display raw mail source window: {e}")
 
     def get_tags(self):
-        """Queries the notmuch database for tags of the current mail's message ID."""
+        """
+        Returns the tags of the current mail's message ID, as last read by
+        refresh_tags_async.
+        """
         if not self.message_id:
             return []
-        self.tags = get_tags_from_query( f'id:{self.message_id}', lambda *args: display_error( self, *args) )
+        self.tags = list(self._tags_cache)
         return self.tags
 
+    def on_database_changed(self):
+        """Tags may have been changed by another process; refetch them."""
+        self.refresh_tags_async()
+
+    def refresh_tags_async(self):
+        """
+        Re-reads the tags of the current mail in a QProcess so the GUI keeps
+        painting while notmuch runs. Requests arriving while a query is in
+        flight are coalesced into one follow-up query.
+        """
+        if not self.message_id:
+            return
+        if self._tags_proc.state() != QProcess.ProcessState.NotRunning:
+            self._tags_refresh_pending = True
+            return
+        self._tags_refresh_pending = False
+        # No tag edits while the displayed state is about to change
+        self.tags_button.setEnabled(False)
+        self.tags_scroll_area.setEnabled(False)
+        command = tags_query_command( f'id:{self.message_id}' )
+        self._tags_proc.start(command[0], command[1:])
+
+    def _on_tags_proc_finished(self, exit_code, exit_status):
+        self.tags_button.setEnabled(True)
+        self.tags_scroll_area.setEnabled(True)
+        if exit_status == QProcess.ExitStatus.NormalExit and exit_code == 0:
+            output = bytes(self._tags_proc.readAllStandardOutput()).decode('utf-8', errors='replace')
+            self._tags_cache = parse_tags_output(output)
+            if self._initial_tags_pending:
+                self._initial_tags_pending = False
+                self.process_initial_tags()
+        else:
+            stderr = bytes(self._tags_proc.readAllStandardError()).decode('utf-8', errors='replace')
+            display_error(self, "Notmuch Command Failed", f"An error occurred while running notmuch:\n\n{stderr}")
+        if self._tags_refresh_pending:
+            self.refresh_tags_async()
+            return
+        self.update_postpone_button()
+        self.update_tags_ui()
+
+    def _on_tags_proc_error(self, error):
+        if error == QProcess.ProcessError.FailedToStart:
+            self.tags_button.setEnabled(True)
+            self.tags_scroll_area.setEnabled(True)
+            display_error(self, "Notmuch Not Found", "The 'notmuch' command was not found. Please ensure it is installed and in your PATH.")
+
     def update_tags_ui(self):
-        """Clears and rebuilds the UI to display the current tags and their states."""
-        # Clear existing tag widgets
-        while self.tags_layout.count():
-            item = self.tags_layout.takeAt(0)
-            if item.widget():
-                item.widget().deleteLater()
-        
+        """Rebuilds the UI to display the current tags and their states."""
+        # Build a fresh container and swap it in at the end; the scroll area
+        # deletes the old one, so there is no per-widget teardown
+        tags_container = QWidget()
+        self.tags_layout = QHBoxLayout(tags_container)
+        self.tags_layout.setContentsMargins(0, 0, 0, 0)
+
         # Fetch the latest tags
         current_tags = set(self.get_tags())
         # Filter out special tags starting with '$'
@@ -601,14 +912,14 @@ class MailViewer(QMainWindow):
         self.tags_state = {tag: tag in current_tags for tag in non_status_tags + status_tags}
 
         # Add a button for each tag, styled by its state
+        interface_font = config.get_interface_font()
         for tag, is_attached in self.tags_state.items():
             tag_button = QPushButton(tag)
-            tag_button.setFont(config.get_interface_font())
-            if not is_attached:
-                tag_button.setStyleSheet("QPushButton { color: gray; }")
+            tag_button.setFont(interface_font)
+            tag_button.setProperty("attached", is_attached)
 
             # Connect the button click to the toggle function
-            tag_button.clicked.connect(lambda checked, t=tag: self.toggle_tag(t))
+            tag_button.clicked.connect(partial(self.toggle_tag, tag))
             self.tags_layout.addWidget(tag_button)
 
         # Add stretch to push the next button to the right
@@ -619,8 +930,10 @@ class MailViewer(QMainWindow):
         add_tag_button.clicked.connect(self.add_tag_dialog)
         self.tags_layout.addWidget(add_tag_button)
 
-    def toggle_tag(self, tag):
-        """Toggles a tag's state (add or remove)."""
+        self.tags_scroll_area.setWidget(tags_container)
+
+    def toggle_tag(self, tag, checked=False):
+        """Toggles a tag's state (add or remove); `checked` absorbs the clicked() argument."""
         is_attached = self.tags_state.get(tag, False)
         if is_attached:
             self.remove_tag(tag)
@@ -631,10 +944,9 @@ class MailViewer(QMainWindow):
         """Opens a dialog to add new tags."""
         text, ok = QInputDialog.getText(self, "Add Tags", "Enter tag(s) to add (comma-separated):")
         if ok and text:
-            new_tags = [t.strip() for t in text.split(',')]
-            for tag in new_tags:
-                self.add_tag(tag)
-            self.update_tags_ui()
+            new_tags = [t.strip() for t in text.split(',') if t.strip()]
+            if new_tags:
+                self.add_tags(new_tags)
 
     def remove_tag(self, tag):
         """Removes a tag from the current mail using the notmuch command."""
@@ -642,7 +954,7 @@ class MailViewer(QMainWindow):
             command = ['notmuch', 'tag', f'-{tag}', f'tag:{tag} and id:{self.message_id}']
             subprocess.run(command, check=True, capture_output=True, text=True)
             logging.info(f"Tag '{tag}' removed successfully.")
-            self.update_tags_ui()
+            self.refresh_tags_async()
         except subprocess.CalledProcessError as e:
             display_error(self, "Failed to Remove Tag", f"Failed to remove tag '{tag}':\n\n{e.stderr}")
         except FileNotFoundError:
@@ -652,7 +964,7 @@ class MailViewer(QMainWindow):
         self.tags_state.pop(tag)
         self.remove_tag(tag)
 
-    def really_toggle_tag(self, tag):
+    def really_toggle_tag(self, tag, checked=False):
         is_attached = self.tags_state.get(tag, False)
         if is_attached:
             self.really_remove_tag(tag)
@@ -661,14 +973,19 @@ class MailViewer(QMainWindow):
 
     def add_tag(self, tag):
         """Adds a new tag to the current mail."""
+        self.add_tags([tag])
+
+    def add_tags(self, tags, refresh=True):
+        """Adds several tags to the current mail with a single notmuch call."""
         try:
             # Use the more reliable id:<message-id> query
-            command = ['notmuch', 'tag', f'+{tag}', f'id:{self.message_id}']
+            command = ['notmuch', 'tag'] + [f'+{tag}' for tag in tags] + ['--', f'id:{self.message_id}']
             subprocess.run(command, check=True, capture_output=True, text=True)
-            logging.info(f"Tag '{tag}' added successfully.")
-            self.update_tags_ui()
+            logging.info(f"Tags {tags} added successfully.")
+            if refresh:
+                self.refresh_tags_async()
         except subprocess.CalledProcessError as e:
-            display_error(self, "Failed to Add Tag", f"Failed to add tag '{tag}':\n\n{e.stderr}")
+            display_error(self, "Failed to Add Tag", f"Failed to add tag(s) '{', '.join(tags)}':\n\n{e.stderr}")
 
 
     def _create_draft_and_open_editor(self, to_addrs, cc_addrs, subject_text, body_text, in_reply_to=None):
@@ -696,17 +1013,15 @@ class MailViewer(QMainWindow):
             QMessageBox.critical(self, "Error", f"Failed to create or open draft: {e}")
 
     def all_involved(self):
-        sender = self.message.get("From")
-        sender_addr = getaddresses([sender])[0][1] if sender else ""
-        original_to = self.message.get("To", "")
-        original_cc = self.message.get("Cc", "")
-        all_recipients = {addr for name, addr in getaddresses([original_to, original_cc])}
-        if sender:
-            all_recipients.add(sender_addr)
+        all_recipients = {addr for name, addr in self.get_addresses("To") + self.get_addresses("Cc")}
+        if self.message.get("From"):
+            all_recipients.add(self.get_sender_address())
         return all_recipients
         
     def all_my_identities(self):
-        return { addr for addr in self.all_involved() if config.is_me( [addr] ) }
+        # Parse the identities once instead of once per involved address
+        my_addresses = config.get_my_addresses()
+        return { addr for addr in self.all_involved() if addr.casefold() in my_addresses }
 
     def my_first_identity(self):
         dummy = list( self.all_my_identities() )
@@ -715,24 +1030,39 @@ class MailViewer(QMainWindow):
         return ""
 
     def all_other_identities(self):
-        return { addr for addr in self.all_involved() if not config.is_me( [addr] ) }
+        my_addresses = config.get_my_addresses()
+        return { addr for addr in self.all_involved() if addr.casefold() not in my_addresses }
 
     def get_body(self):
         """
         Extracts the body of the email.
         It prioritizes plain text, but falls back to converting HTML to plain text.
         """
-        original_body = ""
-        html_body = ""
+        # Replying and forwarding quote the same body; extract it once
+        if self.quote_body is None:
+            self.quote_body = self.extract_body()
+        return self.quote_body
+
+    def extract_body(self):
+        # Pick the parts first, then decode only until a body is found; the
+        # html parts are not decoded at all when there is a plain text body
+        plain_parts = []
+        html_parts = []
         for part in self.message.walk():
-            content_type = part.get_content_type()
-            if content_type == 'text/plain' and not original_body:
-                original_body = part.get_payload(decode=True).decode(part.get_content_charset() or 'utf-8', errors='ignore')
-            elif content_type == 'text/html' and not html_body:
-                html_body = part.get_payload(decode=True).decode(part.get_content_charset() or 'utf-8', errors='ignore')
-        if not original_body and html_body:
-            original_body = html_to_plain_text( html_body )
-        return original_body
+            content_type, _ = classify_part(part)
+            if content_type == 'text/plain':
+                plain_parts.append(part)
+            elif content_type == 'text/html':
+                html_parts.append(part)
+        for part in plain_parts:
+            original_body = part.get_payload(decode=True).decode(part.get_content_charset() or 'utf-8', errors='ignore')
+            if original_body:
+                return original_body
+        for part in html_parts:
+            html_body = part.get_payload(decode=True).decode(part.get_content_charset() or 'utf-8', errors='ignore')
+            if html_body:
+                return html_to_plain_text( html_body )
+        return ""
 
     def get_quoted_body(self):
         original_body = self.get_body()
@@ -745,8 +1075,7 @@ class MailViewer(QMainWindow):
         if not self.message:
             return
         
-        sender = self.message.get("From")
-        sender_addr = getaddresses([sender])[0][1] if sender else ""
+        sender_addr = self.get_sender_address()
         
         from_addr = self.my_first_identity()
 
@@ -770,8 +1099,7 @@ class MailViewer(QMainWindow):
         if not self.message:
             return
         
-        sender = self.message.get("From")
-        sender_addr = getaddresses([sender])[0][1] if sender else ""
+        sender_addr = self.get_sender_address()
         to_list = [sender_addr]
        
         all_recipients = self.all_involved()
@@ -795,8 +1123,8 @@ class MailViewer(QMainWindow):
         if not self.message:
             return
         
-        to_list = { addr for name, addr in getaddresses( [self.message.get("To", "")] ) }
-        cc_list = { addr for name, addr in getaddresses( [self.message.get("Cc", "")] ) }
+        to_list = { addr for name, addr in self.get_addresses("To") }
+        cc_list = { addr for name, addr in self.get_addresses("Cc") }
 
         original_subject = self.message.get("Subject", "")
         if not original_subject.lower().startswith("re:"):
@@ -882,116 +1210,129 @@ class MailViewer(QMainWindow):
 
     def show_attachment_context_menu(self, pos):
         """Shows a context menu with actions for the clicked attachment."""
-        item = self.attachments_list.itemAt(pos)
-        if item:
-            menu = QMenu(self)
-            menu.setFont(config.get_menu_font())
-
-            open_action = QAction("Open", self)
-            open_action.triggered.connect(lambda: self.handle_attachment_open(item))
-            menu.addAction(open_action)
-            
-            save_as_action = QAction("Save As...", self)
-            save_as_action.triggered.connect(lambda: self.handle_attachment_save_as(item))
-            menu.addAction(save_as_action)
-            
-            menu.exec(self.attachments_list.mapToGlobal(pos))
+        index = self.attachments_list.indexAt(pos)
+        if index.isValid():
+            self.attachment_menu_row = index.row()
+            self.attachment_menu.exec(self.attachments_list.mapToGlobal(pos))
 
 
-    def get_attachment_payload(self, part):
-        if part['binary']:
-            return base64.b64decode(part['payload'])
-        else:
-            # CONVERSION: The payload is a string (str), so we must encode it to bytes.
-            # Assuming 'UTF-8' encoding for non-binary text attachments.
-            text_payload_str = part['payload']
-            if not isinstance(text_payload_str, str):
-                raise TypeError("Expected attachment payload to be a string when 'binary' is false.")
-            encoding = part.get('encoding') or 'utf-8' 
-            return text_payload_str.encode(encoding)
+    def get_attachment_filename(self, part):
+        return part.get_filename() or "attachment.bin"
+
+    def write_attachment_payload(self, part, out):
+        """Decodes an attachment part on demand, streaming it into the binary file `out`."""
+        if part.is_multipart():
+            raise TypeError(f"Attachment payload has unexpected type: {part.get_content_type()}")
+        write_part_payload( part, out )
 
 
-    def handle_attachment_open(self, item):
+    def handle_attachment_open(self, part_index):
         """Saves the attachment to a temporary file and opens it."""
         try:
-            part_index = self.attachments_list.row(item)
-            attachment_part = self.attachments[part_index]
-            filename = attachment_part['filename']
-
-            # Decode the base64 payload
-            payload_bytes = self.get_attachment_payload( attachment_part )
-
-            with tempfile.NamedTemporaryFile(suffix=f"_{filename}", delete=False) as temp_file:
-                temp_file.write(payload_bytes)
-                temp_file.flush()
-                os.fsync(temp_file.fileno()) # Force write to disk
-                temp_path = temp_file.name
-                stats = os.stat(temp_path)
-                print(f"DEBUG: File size on disk: {stats.st_size} bytes")
-                mime_check = subprocess.run(["xdg-mime", "query", "filetype", temp_path], 
-                                            capture_output=True, text=True)
-                print(f"DEBUG: Detected MIME = {mime_check.stdout.strip()}")
-                subprocess.run(["xdg-open", temp_path])
-                
-        except Exception as e:
+            # Reopening an attachment hands the already decoded file to the
+            # viewer again instead of decoding it once more
+            temp_path = self.opened_attachments.get(part_index)
+            if temp_path is None or not os.path.exists(temp_path):
+                temp_path = self.decode_attachment_to_temp_file(part_index)
+                self.opened_attachments[part_index] = temp_path
+
+            # Detached, so the viewer stays responsive while the handler runs
+            try:
+                subprocess.Popen(
+                    ["xdg-open", temp_path],
+                    stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                    start_new_session=True
+                )
+            except FileNotFoundError:
+                # No xdg-open installed; let Qt hand the file to the platform opener
+                if not QDesktopServices.openUrl(QUrl.fromLocalFile(temp_path)):
+                    raise
+
+        except (OSError, ValueError, TypeError, LookupError, MessageError) as e:
             QMessageBox.critical(self, "Error", f"Could not open attachment: {e}")
 
-
-    def handle_attachment_save_as(self, item):
+    def attachment_temp_dir(self, part):
+        """Returns tmpfs for small attachments, None (the default temp dir) otherwise."""
+        if not (os.path.isdir(_SHM_DIR) and os.access(_SHM_DIR, os.W_OK)):
+            return None
+        payload = part.get_payload()
+        # The encoded size bounds the decoded size from above
+        if not isinstance(payload, (str, bytes)) or len(payload) > _SHM_MAX_ATTACHMENT:
+            return None
+        return _SHM_DIR
+
+    def decode_attachment_to_temp_file(self, part_index):
+        """Decodes an attachment into a temporary file that is removed at exit."""
+        attachment_part = self.attachments[part_index]
+        filename = self.get_attachment_filename(attachment_part)
+
+        # Keep the real extension for xdg-open and a bounded, sanitized
+        # stem for the user; long or odd names must not break mkstemp
+        name = Path(filename).name
+        stem = re.sub(r'[^\w.-]', '_', Path(name).stem).encode()[:64].decode(errors='ignore')
+        ext = re.sub(r'[^\w.-]', '_', Path(name).suffix)[:16]
+
+        # Decode the payload straight into the temporary file
+        with tempfile.NamedTemporaryFile(prefix=f"{stem}_", suffix=ext, dir=self.attachment_temp_dir(attachment_part), delete=False) as temp_file:
+            self.write_attachment_payload( attachment_part, temp_file )
+            temp_path = temp_file.name
+        attachment_temp_files.append(temp_path)
+        return temp_path
+
+
+    def handle_attachment_save_as(self, part_index):
         """Prompts the user to save the attachment to a chosen location."""
         try:
-            part_index = self.attachments_list.row(item)
             attachment_part = self.attachments[part_index]
-            filename = attachment_part['filename']
+            filename = self.get_attachment_filename(attachment_part)
 
             save_path, _ = QFileDialog.getSaveFileName(self, "Save Attachment", filename)
         
             if save_path:
-                payload_bytes = self.get_attachment_payload( attachment_part )
                 with open(save_path, 'wb') as f:
-                    f.write(payload_bytes)
+                    self.write_attachment_payload( attachment_part, f )
             
-        except Exception as e:
+        except (OSError, ValueError, TypeError, LookupError, MessageError) as e:
             QMessageBox.critical(self, "Error", f"Could not save attachment: {e}")
 
 
     def show_content_context_menu(self, pos):
-        """Creates a context menu for the mail content area."""
-        menu = QMenu(self)
-        menu.setFont(config.get_menu_font())
-        copy_action = QAction("Copy", self)
-        copy_action.triggered.connect(self.mail_content.copy)
-        menu.addAction(copy_action)
-        menu.addSeparator()
+        """Shows the context menu for the mail content area."""
+        self.content_menu.exec(self.mail_content.mapToGlobal(pos))
         
-        view_raw_action = QAction("View Raw Message", self)
-        view_raw_action.triggered.connect(lambda: self.show_mock_action("Raw message will be opened in $EDITOR."))
-        menu.addAction(view_raw_action)
-
-        menu.exec(self.mail_content.mapToGlobal(pos))
-        
-    def show_mock_action(self, message):
+    def copy_selection_to_clipboard(self, checked=False):
+        """Copies the selected body text to the clipboard as plain text only."""
+        text = self.mail_content.textCursor().selection().toPlainText()
+        if text:
+            QApplication.clipboard().setText(text, QClipboard.Clipboard)
+
+    def show_mock_action(self, message, checked=False):
+        """Shows a placeholder notice; `checked` absorbs the triggered() argument."""
         QMessageBox.information(self, "Action Mocked", message)
 
     def _on_config_changed(self):
         """Reapply fonts and relayout after config changes."""
+        interface_font = config.get_interface_font()
+        menu_font = config.get_menu_font()
         central_widget = self.centralWidget()
         if central_widget:
-            central_widget.setFont(config.get_interface_font())
-        self.compose_button.setFont(config.get_interface_font())
-        self.compose_menu.setFont(config.get_menu_font())
-        self.tags_button.setFont(config.get_interface_font())
-        self.tags_menu.setFont(config.get_menu_font())
-        self.view_thread_button.setFont(config.get_interface_font())
-        self.view_source_button.setFont(config.get_interface_font())
-        self.toggle_header_visibility_button.setFont(config.get_interface_font())
-        self.toggle_html_button.setFont(config.get_interface_font())
-        self.postpone_button.setFont(config.get_interface_font())
-        self.delete_button.setFont(config.get_interface_font())
-        self.quit_button.setFont(config.get_interface_font())
+            central_widget.setFont(interface_font)
+        self.compose_button.setFont(interface_font)
+        self.compose_menu.setFont(menu_font)
+        self.tags_button.setFont(interface_font)
+        self.tags_menu.setFont(menu_font)
+        self.content_menu.setFont(menu_font)
+        self.view_thread_button.setFont(interface_font)
+        self.view_source_button.setFont(interface_font)
+        self.toggle_header_visibility_button.setFont(interface_font)
+        self.toggle_html_button.setFont(interface_font)
+        self.postpone_button.setFont(interface_font)
+        self.delete_button.setFont(interface_font)
+        self.quit_button.setFont(interface_font)
         self.mail_content.setFont(config.get_text_font())
         if hasattr(self, 'attachments_list') and self.attachments_list:
             self.attachments_list.setFont(config.get_attachment_font())
+            self.attachment_menu.setFont(menu_font)
         self.headers_group_box.update_fonts()
         # Rebuild tags UI to pick up new interface font
         self.update_tags_ui()
@@ -1001,6 +1342,9 @@ class MailViewer(QMainWindow):
         logging.info(f"Closing mail viewer for mail file = {self.mail_file_path}")
         Config.unregister_callback(self._on_config_changed)
         self.dir_watcher.stop()
+        if self._tags_proc.state() != QProcess.ProcessState.NotRunning:
+            self._tags_proc.kill()
+            self._tags_proc.waitForFinished(1000)
         super().closeEvent(event)
 
 
@@ -1009,9 +1353,22 @@ class MailViewer(QMainWindow):
 keep_alive = []
 mail_source_viewers = []
 
-def run ( args_mail_file ):
+# Temporary copies of attachments handed to external applications
+attachment_temp_files = []
+
+def remove_attachment_temp_files():
+    for temp_path in attachment_temp_files:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+    attachment_temp_files.clear()
+
+atexit.register(remove_attachment_temp_files)
+
+def run ( args_mail_file, headers_only=False ):
     try:
-        viewer = MailViewer( args_mail_file )
+        viewer = MailViewer( args_mail_file, headers_only=headers_only )
     except Exception as e:
         logging.error(f"Could not open mail viewer: {e}")
         QMessageBox.critical(None, "Cannot Open Mail", f"Could not open the mail file:\n\n{e}")
@@ -1024,6 +1381,7 @@ def run ( args_mail_file ):
 def main():
     parser = argparse.ArgumentParser(description="View a single mail file.")
     parser.add_argument("mail_file", help="The full path to the mail file to view.")
+    parser.add_argument("--headers-only", action="store_true", help="Only read and show the headers; the body is not parsed.")
     args = parser.parse_args()
     
     app = QApplication(sys.argv)
@@ -1034,7 +1392,7 @@ def main():
     app.setApplicationName( "KubuxMailClient" )
     setup_tooltip_font()
     
-    run( args.mail_file )
+    run( args.mail_file, headers_only=args.headers_only )
     app.exec()
 
 if __name__ == "__main__":
@@ -3,6 +3,8 @@ Unit tests for common.py - Pure functions without external dependencies.
 
 Tests for:
 - html_to_plain_text()
+- write_part_payload()
+- classify_part()
 
 Note: html_to_plain_text() is implemented via the html2text library, so the
 output is markdown-flavored plain text: "**bold**", "_italic_",
@@ -11,6 +13,10 @@ output ends with a trailing blank line ("\n\n").
 """
 import pytest
 import sys
+import io
+import email
+import email.policy
+from email.message import EmailMessage
 import importlib.util
 
 # Load common.py as a module (no hyphen)
@@ -19,7 +25,7 @@ common = importlib.util.module_from_spec(spec)
 sys.modules["common"] = common
 spec.loader.exec_module(common)
 
-from common import html_to_plain_text
+from common import html_to_plain_text, write_part_payload, classify_part
 
 
 class TestHtmlToPlainText:
@@ -235,3 +241,96 @@ class TestHtmlToPlainText:
         html = "<p>First</p><div>Second</div><span>Third</span>"
         result = html_to_plain_text(html)
         assert result == "First\n\nSecond\n\nThird\n\n"
+
+
+class TestWritePartPayload:
+    """Tests for write_part_payload function."""
+
+    @pytest.mark.parametrize("chunk_size", [3, 4, 77, 65536])
+    def test_base64_roundtrip(self, chunk_size):
+        """Test base64 payloads decode identically for any chunk size."""
+        data = bytes(range(256)) * 40
+        part = EmailMessage()
+        part.set_content(data, maintype="application", subtype="octet-stream")
+        out = io.BytesIO()
+        write_part_payload(part, out, chunk_size=chunk_size)
+        assert out.getvalue() == data
+
+    @pytest.mark.parametrize("chunk_size", [1, 7, 65536])
+    def test_quoted_printable_roundtrip(self, chunk_size):
+        """Test quoted-printable payloads decode identically for any chunk size."""
+        data = b"caf\xe9 = coffee\n" * 5 + b"x" * 200 + b"\t \n"
+        part = EmailMessage()
+        part.set_content(data, maintype="application", subtype="octet-stream", cte="quoted-printable")
+        out = io.BytesIO()
+        write_part_payload(part, out, chunk_size=chunk_size)
+        assert out.getvalue() == data
+
+    def test_seven_bit_falls_back(self):
+        """Test other encodings use the email package decoder."""
+        part = email.message_from_string(
+            "Content-Type: text/plain\n"
+            "Content-Transfer-Encoding: 7bit\n\n"
+            "plain text\n"
+        )
+        out = io.BytesIO()
+        write_part_payload(part, out)
+        assert out.getvalue() == part.get_payload(decode=True)
+
+    @pytest.mark.parametrize("chunk_size", [1, 2, 3, 4, 5, 8, 65536])
+    def test_padding_at_chunk_boundary_matches_get_payload(self, chunk_size):
+        """Test data after padding, with the padding on a chunk boundary, decodes like get_payload(decode=True)."""
+        part = email.message_from_string(
+            "Content-Type: application/octet-stream\n"
+            "Content-Transfer-Encoding: base64\n\n"
+            "QQ==fg==\n"
+        )
+        out = io.BytesIO()
+        write_part_payload(part, out, chunk_size=chunk_size)
+        assert out.getvalue() == part.get_payload(decode=True)
+
+    def test_malformed_base64_matches_get_payload(self):
+        """Test malformed base64 is decoded like get_payload(decode=True)."""
+        part = email.message_from_string(
+            "Content-Type: application/octet-stream\n"
+            "Content-Transfer-Encoding: base64\n\n"
+            "aGVs!bG8=\n"
+        )
+        out = io.BytesIO()
+        write_part_payload(part, out)
+        assert out.getvalue() == part.get_payload(decode=True)
+
+
+class TestClassifyPart:
+    """Tests for classify_part function."""
+
+    MIXED = (
+        "Content-Type: multipart/mixed; boundary=X\n\n"
+        "--X\nContent-Type: text/plain\n\nhi\n"
+        "--X\nContent-Type: TEXT/HTML; charset=utf-8\n\n<b>hi</b>\n"
+        "--X\nContent-Type: application/pdf; name=\"a.pdf\"\n\nxx\n"
+        "--X\nContent-Disposition: attachment\n\nyy\n"
+        "--X\nContent-Disposition: inline; filename*=utf-8''x.txt\n\nzz\n"
+        "--X\nContent-Type: text/plain (comment)\nContent-Disposition: Attachment ; filename=\"\"\n\nq\n"
+        "--X\n\nno headers\n"
+        "--X\nContent-Type: bogus\n\nb\n"
+        "--X--\n"
+    )
+
+    def test_matches_full_header_parser(self):
+        """Test the raw-header fast path agrees with the email package."""
+        msg = email.message_from_string(self.MIXED, policy=email.policy.default)
+        parts = [part for part in msg.walk() if not part.is_multipart()]
+        assert len(parts) == 8
+        for part in parts:
+            expected = (
+                part.get_content_type(),
+                part.get_content_disposition() == 'attachment' or bool(part.get_filename()),
+            )
+            assert classify_part(part) == expected
+
+    def test_plain_body_is_not_attachment(self):
+        """Test a simple text body."""
+        part = EmailMessage()
+        part.set_content("hello")
+        assert classify_part(part) == ("text/plain", False)
@@ -13,6 +13,7 @@ Tests for:
 - Config.get_model()
 - Config.get_autocompletions()
 - Config.is_me()
+- Config.get_my_addresses()
 """
 import pytest
 from pathlib import Path
@@ -339,6 +340,36 @@ interface_font = "monospace"
         assert model_path is None
 
 
+class TestConfigGetMaxMailSize:
+    """Tests for Config.get_max_mail_size() method."""
+    
+    def test_get_max_mail_size(self, tmp_path):
+        """Test retrieving the configured size limit."""
+        config_content = """
+[viewer]
+max_mail_size = 1048576
+"""
+        config_file = tmp_path / "config.toml"
+        config_file.write_text(config_content)
+        
+        config = Config(str(config_file))
+        
+        assert config.get_max_mail_size() == 1048576
+    
+    def test_get_max_mail_size_default(self, tmp_path):
+        """Test that the limit defaults to 100 MiB."""
+        config_content = """
+[visual]
+interface_font = "monospace"
+"""
+        config_file = tmp_path / "config.toml"
+        config_file.write_text(config_content)
+        
+        config = Config(str(config_file))
+        
+        assert config.get_max_mail_size() == 100 * 1024 * 1024
+
+
 class TestConfigGetAutocompletions:
     """Tests for Config.get_autocompletions() method."""
     
@@ -444,3 +475,19 @@ identities = [
         assert config.is_me(["test2@example.com"]) is True
         # Should not match unknown
         assert config.is_me(["test3@example.com"]) is False
+    
+    def test_get_my_addresses(self, tmp_path):
+        """Test identity addresses are returned casefolded."""
+        config_content = """
+[email_identities]
+identities = [
+    {name = "Test 1", email = "Test1@Example.com"},
+    {name = "Test 2", email = "Test 2 <test2@example.com>"}
+]
+"""
+        config_file = tmp_path / "config.toml"
+        config_file.write_text(config_content)
+        
+        config = Config(str(config_file))
+        
+        assert config.get_my_addresses() == {"test1@example.com", "test2@example.com"}
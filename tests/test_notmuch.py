@@ -1,5 +1,5 @@
 """
-Integration tests for notmuch.py - Notmuch wrapper functions.
+Integration tests for notmuch_api.py - Notmuch wrapper functions.
 
 Tests for:
 - notmuch_show()
@@ -8,6 +8,7 @@ Tests for:
 - notmuch_search()
 - find_matching_threads()
 - apply_tag_to_query()
+- apply_tags_to_query()
 - get_tags_from_query()
 - update_unseen_from_query()
 
@@ -20,19 +21,20 @@ import sys
 from pathlib import Path
 import importlib.util
 
-# Load notmuch.py as a module (no hyphen)
-spec = importlib.util.spec_from_file_location("notmuch", "../scripts/notmuch.py")
-notmuch = importlib.util.module_from_spec(spec)
-sys.modules["notmuch"] = notmuch
-spec.loader.exec_module(notmuch)
+# Load notmuch_api.py as a module
+spec = importlib.util.spec_from_file_location("notmuch_api", "../scripts/notmuch_api.py")
+notmuch_api = importlib.util.module_from_spec(spec)
+sys.modules["notmuch_api"] = notmuch_api
+spec.loader.exec_module(notmuch_api)
 
-from notmuch import (
+from notmuch_api import (
     notmuch_show,
     flatten_message_tree,
     find_matching_messages,
     notmuch_search,
     find_matching_threads,
     apply_tag_to_query,
+    apply_tags_to_query,
     get_tags_from_query,
     update_unseen_from_query
 )
@@ -83,7 +85,8 @@ class TestNotmuchShow:
         from subprocess import CalledProcessError
         mock_run.side_effect = CalledProcessError(1, 'notmuch', stderr='Error')
         
-        notmuch_show("tag:inbox", "newest-first", flag_error_mock)
+        with pytest.raises(CalledProcessError):
+            notmuch_show("tag:inbox", "newest-first", flag_error_mock)
         
         flag_error_mock.assert_called_once()
         call_args = flag_error_mock.call_args[0]
@@ -96,11 +99,12 @@ class TestNotmuchShow:
         mock_result.stdout = "invalid json"
         mock_run.return_value = mock_result
         
-        notmuch_show("tag:inbox", "newest-first", flag_error_mock)
+        with pytest.raises(json.JSONDecodeError):
+            notmuch_show("tag:inbox", "newest-first", flag_error_mock)
         
         flag_error_mock.assert_called_once()
         call_args = flag_error_mock.call_args[0]
-        assert "JSON" in call_args[0]
+        assert "JSON" in call_args[1]
 
 
 class TestFlattenMessageTree:
@@ -114,7 +118,7 @@ class TestFlattenMessageTree:
     def test_flatten_single_message(self):
         """Test flattening single message."""
         threads = [
-            [[{"id": "msg1"}]]
+            [[{"id": "msg1"}, []]]
         ]
         result = flatten_message_tree(threads)
         assert len(result) == 1
@@ -178,18 +182,16 @@ class TestFlattenMessageTree:
 class TestFindMatchingMessages:
     """Tests for find_matching_messages() function."""
     
-    @patch('notmuch.flatten_message_tree')
-    @patch('notmuch.notmuch_show')
+    @patch('notmuch_api.flatten_message_tree')
+    @patch('notmuch_api.notmuch_show')
     def test_find_matching_messages_filters_match_true(self, mock_show, mock_flatten, flag_error_mock):
         """Test that only messages with match=True are returned."""
-        mock_show.return_value = [
-            [
-                [{"id": "msg1", "match": True}],
-                [{"id": "msg2", "match": False}],
-                [{"id": "msg3", "match": True}]
-            ]
+        mock_show.return_value = [[[{"id": "msg1"}, []]]]
+        mock_flatten.return_value = [
+            {"id": "msg1", "match": True},
+            {"id": "msg2", "match": False},
+            {"id": "msg3", "match": True}
         ]
-        mock_flatten.side_effect = lambda x: x
         
         result = find_matching_messages("tag:inbox", flag_error_mock)
         
@@ -197,8 +199,8 @@ class TestFindMatchingMessages:
         assert result[0]["id"] == "msg1"
         assert result[1]["id"] == "msg3"
     
-    @patch('notmuch.flatten_message_tree')
-    @patch('notmuch.notmuch_show')
+    @patch('notmuch_api.flatten_message_tree')
+    @patch('notmuch_api.notmuch_show')
     def test_find_matching_messages_empty_result(self, mock_show, mock_flatten, flag_error_mock):
         """Test with no matching messages."""
         mock_show.return_value = []
@@ -208,8 +210,8 @@ class TestFindMatchingMessages:
         
         assert result == []
     
-    @patch('notmuch.flatten_message_tree')
-    @patch('notmuch.notmuch_show')
+    @patch('notmuch_api.flatten_message_tree')
+    @patch('notmuch_api.notmuch_show')
     def test_find_matching_messages_calls_flatten(self, mock_show, mock_flatten, flag_error_mock):
         """Test that flatten_message_tree is called."""
         mock_show.return_value = [[{"id": "msg1", "match": True}]]
@@ -259,7 +261,7 @@ class TestNotmuchSearch:
 class TestFindMatchingThreads:
     """Tests for find_matching_threads() function."""
     
-    @patch('notmuch.notmuch_search')
+    @patch('notmuch_api.notmuch_search')
     def test_find_matching_threads(self, mock_search, flag_error_mock):
         """Test thread retrieval."""
         mock_search.return_value = [
@@ -307,6 +309,19 @@ class TestApplyTagToQuery:
         assert mock_run.call_args[1]['check'] is True
 
 
+class TestApplyTagsToQuery:
+    """Tests for apply_tags_to_query() function."""
+    
+    @patch('subprocess.run')
+    def test_apply_tags_single_invocation(self, mock_run, flag_error_mock):
+        """Test all tag operations go into one notmuch call."""
+        apply_tags_to_query(["+work", "-inbox"], "tag:inbox", flag_error_mock)
+        
+        mock_run.assert_called_once()
+        assert mock_run.call_args[0][0] == ['notmuch', 'tag', '+work', '-inbox', '--', 'tag:inbox']
+        assert mock_run.call_args[1]['check'] is True
+
+
 class TestGetTagsFromQuery:
     """Tests for get_tags_from_query() function."""
     
@@ -315,7 +330,7 @@ class TestGetTagsFromQuery:
         """Test successful tag retrieval."""
         mock_result = MagicMock()
         mock_result.stdout = "inbox\nunread\nwork\n"
-        mock_result.return_value = mock_result
+        mock_run.return_value = mock_result
         
         result = get_tags_from_query("tag:inbox", flag_error_mock)
         
@@ -375,26 +390,24 @@ class TestGetTagsFromQuery:
 class TestUpdateUnseenFromQuery:
     """Tests for update_unseen_from_query() function."""
     
-    @patch('notmuch.apply_tag_to_query')
-    @patch('notmuch.get_tags_from_query')
+    @patch('notmuch_api.apply_tags_to_query')
+    @patch('notmuch_api.get_tags_from_query')
     def test_update_unseen_when_present(self, mock_get_tags, mock_apply, flag_error_mock):
         """Test conversion when $unseen tag is present."""
         mock_get_tags.return_value = ["$unseen", "inbox"]
         
         update_unseen_from_query("id:msg123", flag_error_mock)
         
-        # Should call apply_tag_to_query to add $unused
-        mock_apply.assert_any_call("+$unused", "id:msg123", flag_error_mock)
-        # Should call apply_tag_to_query to remove $unseen
-        mock_apply.assert_any_call("-$unseen", "id:msg123", flag_error_mock)
+        # Should add $unused and remove $unseen in a single call
+        mock_apply.assert_called_once_with(["+$unused", "-$unseen"], "id:msg123", flag_error_mock)
     
-    @patch('notmuch.apply_tag_to_query')
-    @patch('notmuch.get_tags_from_query')
+    @patch('notmuch_api.apply_tags_to_query')
+    @patch('notmuch_api.get_tags_from_query')
     def test_update_unseen_when_absent(self, mock_get_tags, mock_apply, flag_error_mock):
         """Test no action when $unseen tag is absent."""
         mock_get_tags.return_value = ["inbox", "unread"]
         
         update_unseen_from_query("id:msg123", flag_error_mock)
         
-        # Should not call apply_tag_to_query
+        # Should not call apply_tags_to_query
         mock_apply.assert_not_called()